@@ -0,0 +1,263 @@
+import base64
+import bisect
+import heapq
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import orjson
+from ..utils.file_utils import (existing_round_numbers, iter_round_files,
+                                read_round_file, round_file_stat)
+
+# (timestamp, round_num, point_idx, response_idx)
+IndexEntry = Tuple[str, int, int, int]
+
+def encode_cursor(entry: IndexEntry) -> str:
+    """将索引项编码为不透明的分页游标"""
+    timestamp, round_num, point_idx, response_idx = entry
+    # orjson 输出紧凑的 UTF-8 字节，与之前 json.dumps(separators=(",", ":")) 的游标一致
+    payload = orjson.dumps({"ts": timestamp, "rn": round_num, "pi": point_idx, "idx": response_idx})
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+def decode_cursor(cursor: str) -> IndexEntry:
+    """解码分页游标，格式错误时抛出 ValueError"""
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (payload["ts"], int(payload["rn"]), int(payload["pi"]), int(payload["idx"]))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def point_id_of(point: dict) -> str:
+    """获取讨论点 ID，旧数据没有 ID 时根据时间戳生成"""
+    point_id = point.get("id")
+    if not point_id:  # 如果没有 ID 才生成
+        timestamp = point.get("timestamp")
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        elif not isinstance(timestamp, str):
+            timestamp = datetime.utcnow().isoformat()
+        point_id = f"point_{datetime.fromisoformat(timestamp).strftime('%Y%m%d_%H%M%S')}"
+    return point_id
+
+def format_message(response: dict, timestamp, round_num: int) -> dict:
+    """将一条回复转换为 API 消息，只对返回的这一页调用"""
+    return {
+        "model": response["author"],
+        "content": response["content"][:8000],  # 增加到 8000 字符
+        "timestamp": timestamp,
+        "round_num": round_num
+    }
+
+def _compact_response(response: dict) -> dict:
+    """复制一条回复，字符串值驻留（intern）"""
+    return {k: sys.intern(v) if isinstance(v, str) else v for k, v in response.items()}
+
+def _compact_responses(responses: List[dict], previous: Optional[List[dict]]) -> List[dict]:
+    """复制回复列表；与上一次索引的同一讨论点相同的回复直接复用已有对象
+
+    累积的轮次文件里同一条回复会在之后的每一轮重复出现，复用后各轮共用同一份数据，
+    索引的内存随不同回复的数量增长，而不是随轮次数的平方增长。
+    """
+    if previous is None:
+        return [_compact_response(r) for r in responses]
+    compacted = []
+    for i, response in enumerate(responses):
+        if i < len(previous) and previous[i] == response:
+            compacted.append(previous[i])
+        else:
+            compacted.append(_compact_response(response))
+    return compacted
+
+def page_after(entries: List[IndexEntry], cursor_key: IndexEntry, page_size: int) -> Tuple[int, int]:
+    """返回游标之后一页的 (start_idx, end_idx)"""
+    start_idx = bisect.bisect_right(entries, cursor_key)
+    return start_idx, start_idx + page_size
+
+class AgoraIndex:
+    """按时间排序的全局消息索引
+
+    Keeps one sorted entry per agora message so pagination is a slice instead
+    of re-reading and re-sorting every round. The global list is a k-way
+    merge of the per-round lists, redone only after a round changed. A round is
+    re-indexed only when its file's (mtime, size) changed, so unchanged rounds
+    cost one stat per refresh. The index keeps compact per-point records
+    (content plus responses, strings interned) instead of whole round dicts,
+    and each round's responses pre-sorted by node ID, for node history. Hold
+    ``lock`` while reading entries from a storage worker thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # round_num -> [(point_id, {"content", "agreements", "disagreements"})]
+        self._round_points: Dict[int, List[Tuple[str, dict]]] = {}
+        self._round_entries: Dict[int, List[IndexEntry]] = {}
+        self._round_nodes: Dict[int, Dict[str, Tuple[int, List[IndexEntry]]]] = {}
+        # 已索引的轮次及其文件签名
+        self._round_signatures: Dict[int, Tuple[int, int]] = {}
+        self._node_rounds: Dict[str, List[int]] = {}
+        # point_id -> 最近一次索引的该讨论点，后面的轮次复用其中未变化的回复
+        self._latest_points: Dict[str, dict] = {}
+        self._entries: List[IndexEntry] = []
+        self._entries_dirty = False
+        self.messages_per_round: Counter = Counter()
+        self.latest_round = 0
+
+    def refresh(self, max_rounds: int) -> None:
+        """同步第 1 轮到第一个缺失轮次之间的所有轮次"""
+        with self.lock:
+            self._refresh(max_rounds)
+
+    def _refresh(self, max_rounds: int) -> None:
+        # 冷启动（索引为空）时并行读取已有的连续轮次并建立索引，下面的顺序同步只需 stat；
+        # 之后新轮次逐个出现，不需要预读
+        if not self._round_signatures:
+            existing = set(existing_round_numbers())
+            contiguous = []
+            for r in range(1, max_rounds + 1):
+                if r not in existing:
+                    break
+                contiguous.append(r)
+            if len(contiguous) > 1:
+                for r, round_data, signature in iter_round_files(contiguous):
+                    if round_data:
+                        self._index_round(r, round_data, signature)
+
+        latest_round = 0
+        for r in range(1, max_rounds + 1):
+            if not self._sync_round(r):
+                break
+            latest_round = r
+
+        # 之后的轮次不再连续，从索引中移除
+        for r in [r for r in self._round_signatures if r > latest_round]:
+            self._drop_round(r)
+        self.latest_round = latest_round
+
+    def sync_round(self, round_num: int) -> bool:
+        """确保某一轮次的索引是最新的，轮次不存在时返回 False"""
+        with self.lock:
+            return self._sync_round(round_num)
+
+    def _sync_round(self, round_num: int) -> bool:
+        signature = round_file_stat(round_num)
+        if signature is None:
+            self._drop_round(round_num)
+            return False
+        if self._round_signatures.get(round_num) == signature:
+            return True
+
+        round_data, signature = read_round_file(round_num)
+        if not round_data:
+            self._drop_round(round_num)
+            return False
+        self._index_round(round_num, round_data, signature)
+        return True
+
+    def _index_round(self, round_num: int, round_data: dict, signature: Tuple[int, int]) -> None:
+        """为一轮建立索引，只保留分页和节点历史需要的字段"""
+        self._drop_round(round_num)
+        fallback_ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        round_entries = []
+        round_nodes = {}
+        round_points = []
+        for point_idx, point in enumerate(round_data.get("points", [])):
+            point_id = point_id_of(point)
+            previous = self._latest_points.get(point_id)
+            agreements = _compact_responses(
+                point.get("agreements", []), previous and previous["agreements"]
+            )
+            disagreements = _compact_responses(
+                point.get("disagreements", []), previous and previous["disagreements"]
+            )
+            compact_point = {
+                "content": sys.intern(point["content"]),
+                "agreements": agreements,
+                "disagreements": disagreements
+            }
+            self._latest_points[point_id] = compact_point
+            round_points.append((point_id, compact_point))
+            node_keys = []
+            for response_idx, response in enumerate(agreements + disagreements):
+                timestamp = response.get("timestamp")
+                round_entries.append(
+                    (timestamp or fallback_ts, round_num, point_idx, response_idx)
+                )
+                node_keys.append((timestamp or "", round_num, point_idx, response_idx))
+            node_keys.sort()
+            # 同一轮次中 ID 重复时保留第一个
+            round_nodes.setdefault(point_id, (point_idx, node_keys))
+        round_entries.sort()
+
+        self._entries_dirty = True
+        self._round_points[round_num] = round_points
+        self._round_entries[round_num] = round_entries
+        self._round_nodes[round_num] = round_nodes
+        self._round_signatures[round_num] = signature
+        for node_id in round_nodes:
+            bisect.insort(self._node_rounds.setdefault(node_id, []), round_num)
+        self.messages_per_round[round_num] = len(round_entries)
+
+    def find_node(self, node_id: str, current_round: int) -> Optional[Tuple[int, dict, List[IndexEntry]]]:
+        """在第 1 轮到 current_round 中查找节点，返回最早出现的 (round_num, point, sorted_keys)"""
+        with self.lock:
+            for r in range(1, current_round + 1):
+                self._sync_round(r)
+            for r in self._node_rounds.get(node_id, []):
+                if r > current_round:
+                    break
+                point_idx, node_keys = self._round_nodes[r][node_id]
+                return r, self._round_points[r][point_idx][1], node_keys
+            return None
+
+    @property
+    def entries(self) -> List[IndexEntry]:
+        """所有轮次按时间排序的索引，轮次变化后由各轮已排序的列表归并得到"""
+        if self._entries_dirty:
+            self._entries = list(heapq.merge(*self._round_entries.values()))
+            self._entries_dirty = False
+        return self._entries
+
+    @property
+    def rounds(self) -> List[int]:
+        """已索引（即文件存在）的轮次"""
+        return sorted(self._round_signatures)
+
+    def signature(self, round_num: int) -> Optional[Tuple[int, int]]:
+        """已索引轮次文件的 (st_mtime_ns, st_size)，用于生成 ETag"""
+        return self._round_signatures.get(round_num)
+
+    def round_entries(self, round_num: int) -> List[IndexEntry]:
+        """获取某一轮次按时间排序的索引"""
+        return self._round_entries.get(round_num, [])
+
+    def response_at(self, entry: IndexEntry) -> dict:
+        """获取索引项对应的回复"""
+        _, round_num, point_idx, response_idx = entry
+        point = self._round_points[round_num][point_idx][1]
+        agreements = point["agreements"]
+        if response_idx < len(agreements):
+            return agreements[response_idx]
+        return point["disagreements"][response_idx - len(agreements)]
+
+    def round_points(self, round_num: int) -> List[Tuple[str, dict]]:
+        """获取某一轮次的 (point_id, point) 列表，ID 在建立索引时已计算"""
+        return list(self._round_points.get(round_num, ()))
+
+    def hydrate(self, entry: IndexEntry) -> dict:
+        """将索引项还原为 API 消息"""
+        return format_message(self.response_at(entry), entry[0], entry[1])
+
+    def _drop_round(self, round_num: int) -> None:
+        if self._round_signatures.pop(round_num, None) is None:
+            return
+        self._round_points.pop(round_num, None)
+        self._round_entries.pop(round_num, None)
+        for node_id in self._round_nodes.pop(round_num, {}):
+            rounds = self._node_rounds[node_id]
+            rounds.remove(round_num)
+            if not rounds:
+                del self._node_rounds[node_id]
+                self._latest_points.pop(node_id, None)
+        self.messages_per_round.pop(round_num, None)
+        self._entries_dirty = True
@@ -1,17 +1,21 @@
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Optional
 from pydantic import BaseModel, ValidationError
 from datetime import datetime
 from ..discussion.orchestrator import DiscussionOrchestrator
-from ..utils.config import load_config
-from .service import APIService
+from ..config import load_config
 from dotenv import load_dotenv
-import os
 from ..utils.discussion_manager import DiscussionManager
-import json
+import orjson
+import asyncio
+import hashlib
 import logging
-from ..utils.file_utils import read_round_data
+from ..utils.storage_pool import get_storage_executor, run_storage_io, shutdown_storage_pool
+from .message_index import AgoraIndex, decode_cursor, encode_cursor, format_message, page_after
+from .routes_discussion import router as discussion_router
 
 # 环境变量已经通过 docker-compose 加载
 # load_dotenv("src/religion_one_thinking/.env")  # 删除这行
@@ -19,7 +23,8 @@ from ..utils.file_utils import read_round_data
 app = FastAPI(
     title="AI Religion Discussion API",
     description="API for accessing AI religion discussion data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # 添加 CORS 中间件
@@ -30,6 +35,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 压缩较大的 JSON 响应
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# /api/discussion/* 接口
+app.include_router(discussion_router)
 
 # Models
 class ChatMessage(BaseModel):
@@ -66,14 +76,17 @@ class AgoraMessage(BaseModel):
     page: int = Query(1, ge=1)
     page_size: int = Query(20, ge=1, le=100)
     round_num: Optional[int] = None
-
-# 创建服务实例
-api_service = APIService()
+    cursor: Optional[str] = None
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _read_thesis() -> str:
+    """读取初始问题"""
+    with open("src/religion_one_thinking/thesis.txt", "r") as f:
+        return f.read().strip()
+
 # 初始化 orchestrator
 @app.on_event("startup")
 async def startup_event():
@@ -81,34 +94,25 @@ async def startup_event():
     try:
         orchestrator = DiscussionManager.get_orchestrator()
         # 读取初始问题
-        with open("src/religion_one_thinking/thesis.txt", "r") as f:
-            initial_question = f.read().strip()
+        initial_question = await run_storage_io(_read_thesis)
         # 初始化讨论
         await orchestrator.initialize(initial_question)
         print("Orchestrator initialized successfully")
+        # 预先创建存储线程池
+        get_storage_executor()
+        # 启动 WebSocket 增量推送
+        app.state.agora_push_task = asyncio.create_task(_push_agora_deltas())
     except Exception as e:
         print(f"Error initializing orchestrator: {e}")
         raise
 
-def read_round_data(round_num: int) -> dict:
-    """安全地读取轮次数据"""
-    file_path = f"discussions/round_{round_num}.json"
-    try:
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                try:
-                    content = f.read()
-                    print(f"Reading file {file_path}, size: {len(content)} bytes")
-                    data = json.loads(content)
-                    return data
-                except json.JSONDecodeError as e:
-                    print(f"JSON decode error in {file_path}: {str(e)}")
-                    print(f"Content preview: {content[:100]}...")
-                    return {}
-        return {}
-    except Exception as e:
-        print(f"Error reading {file_path}: {str(e)}")
-        return {}
+@app.on_event("shutdown")
+async def shutdown_event():
+    """停止增量推送并关闭存储线程池"""
+    push_task = getattr(app.state, "agora_push_task", None)
+    if push_task:
+        push_task.cancel()
+    shutdown_storage_pool()
 
 class AgoraWebSocketManager:
     def __init__(self):
@@ -122,63 +126,95 @@ class AgoraWebSocketManager:
         self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except WebSocketDisconnect:
+        # 并发发送，广播耗时不随连接数线性增长
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_json(message) for connection in connections),
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception) and connection in self.active_connections:
                 self.disconnect(connection)
 
 agora_manager = AgoraWebSocketManager()
+agora_index = AgoraIndex()
 
-@app.get("/agora")
-async def get_agora(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    round_num: Optional[int] = None
-):
-    """获取当前讨论状态，支持分页"""
+def _parse_cursor(cursor: Optional[str]):
+    """解析分页游标，格式错误时返回 400"""
+    if not cursor:
+        return None
     try:
-        all_messages = []
-        latest_round = 0
-        
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _etag(*parts) -> str:
+    """由轮次文件签名等信息生成 ETag"""
+    return '"' + hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """检查 If-None-Match 请求头是否包含当前 ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def _cache_headers(etag: str, concluded: bool) -> Dict[str, str]:
+    """已结束轮次的数据不会再变化，允许缓存；其余每次都需要验证"""
+    return {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=300" if concluded else "no-cache"
+    }
+
+def _build_agora_response(page: int, page_size: int, round_num: Optional[int], cursor_key,
+                          if_none_match: Optional[str] = None):
+    """在存储线程中同步索引并构建 /agora 响应
+
+    Returns ``(etag, data)``; ``data`` is None when ``if_none_match``
+    already matches, so no page is built.
+    """
+    max_rounds = load_config()["discussion"]["max_rounds"]
+    with agora_index.lock:
         if round_num:
-            round_data = read_round_data(round_num)
-            if round_data and "points" in round_data:
+            entries = []
+            latest_round = 0
+            if agora_index.sync_round(round_num):
+                entries = agora_index.round_entries(round_num)
                 latest_round = round_num
-                for point in round_data["points"]:
-                    for response in point.get("agreements", []) + point.get("disagreements", []):
-                        all_messages.append({
-                            "model": response["author"],
-                            "content": response["content"][:8000],  # 增加到 8000 字符
-                            "timestamp": response.get("timestamp", datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")),
-                            "round_num": round_num
-                        })
+            messages_per_round = {i: 0 for i in range(1, latest_round + 1)}
+            if latest_round:
+                messages_per_round[round_num] = len(entries)
         else:
-            for r in range(1, load_config()["discussion"]["max_rounds"] + 1):
-                round_data = read_round_data(r)
-                if not round_data:
-                    break
-                latest_round = r
-                if "points" in round_data:
-                    for point in round_data["points"]:
-                        for response in point.get("agreements", []) + point.get("disagreements", []):
-                            all_messages.append({
-                                "model": response["author"],
-                                "content": response["content"][:8000],  # 增加到 8000 字符
-                                "timestamp": response.get("timestamp", datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")),
-                                "round_num": r
-                            })
-        
-        # 按时间正序排序
-        all_messages.sort(key=lambda x: x["timestamp"])
-        
-        # 计算分页
-        total_messages = len(all_messages)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_messages = all_messages[start_idx:end_idx]
-        
-        return {
+            agora_index.refresh(max_rounds)
+            entries = agora_index.entries
+            latest_round = agora_index.latest_round
+            messages_per_round = {
+                i: agora_index.messages_per_round[i] for i in range(1, latest_round + 1)
+            }
+
+        # 所有会改变响应内容的参数都要参与 ETag，否则不同分页会拿到同一个 ETag 并被 304
+        request_key = (page, page_size, round_num, cursor_key)
+        if round_num:
+            etag = _etag("agora", request_key, agora_index.signature(round_num))
+        else:
+            etag = _etag("agora", request_key, max_rounds, [
+                (i, agora_index.signature(i)) for i in range(1, latest_round + 1)
+            ])
+        if _etag_matches(if_none_match, etag):
+            return etag, None
+
+        # 计算分页（索引已按时间正序排序）
+        total_messages = len(entries)
+        if cursor_key:
+            start_idx, end_idx = page_after(entries, cursor_key, page_size)
+        else:
+            start_idx = (page - 1) * page_size
+            end_idx = start_idx + page_size
+        page_entries = entries[start_idx:end_idx]
+        paginated_messages = [agora_index.hydrate(e) for e in page_entries]
+        has_more = end_idx < total_messages
+
+        return etag, {
             "messages": paginated_messages,
             "currentRound": latest_round,
             "roundStatus": "ongoing",
@@ -187,24 +223,93 @@ async def get_agora(
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total_messages + page_size - 1) // page_size,
-                "has_more": end_idx < total_messages
+                "has_more": has_more
             },
+            "nextCursor": encode_cursor(page_entries[-1]) if has_more and page_entries else None,
             "debug_info": {
-                "messages_per_round": {
-                    i: len([m for m in all_messages if m["round_num"] == i])
-                    for i in range(1, latest_round + 1)
-                },
+                "messages_per_round": messages_per_round,
                 "total_messages": total_messages,
                 "latest_round": latest_round,
-                "files_found": [i for i in range(1, latest_round + 1) if os.path.exists(f"discussions/round_{i}.json")],
-                "max_rounds": load_config()["discussion"]["max_rounds"]
+                "files_found": [i for i in agora_index.rounds if i <= latest_round],
+                "max_rounds": max_rounds
             }
         }
-        
+
+# 增量推送的检查间隔（秒）
+AGORA_PUSH_INTERVAL = 2
+
+def _collect_new_messages(seen: set) -> List[dict]:
+    """在存储线程中刷新索引，返回 seen 之外的新消息并更新 seen"""
+    max_rounds = load_config()["discussion"]["max_rounds"]
+    with agora_index.lock:
+        agora_index.refresh(max_rounds)
+        new_entries = [e for e in agora_index.entries if e not in seen]
+        seen.clear()
+        seen.update(agora_index.entries)
+        return [
+            dict(agora_index.hydrate(e), cursor=encode_cursor(e)) for e in new_entries
+        ]
+
+async def _push_agora_deltas():
+    """轮次文件有新回复时，向所有 WebSocket 客户端推送增量消息
+
+    Discussions are written by a separate process, so new responses are
+    picked up from the round files through the agora index. Clients load
+    history with ``get_messages`` once and then only receive deltas.
+    """
+    seen = None
+    while True:
+        await asyncio.sleep(AGORA_PUSH_INTERVAL)
+        if not agora_manager.active_connections:
+            seen = None
+            continue
+        try:
+            if seen is None:
+                # 首次有连接时只记录现有消息，历史由客户端自行分页获取
+                seen = set()
+                await run_storage_io(_collect_new_messages, seen)
+                continue
+            messages = await run_storage_io(_collect_new_messages, seen)
+            if messages:
+                await agora_manager.broadcast({"type": "delta", "messages": messages})
+        except Exception as e:
+            logger.error(f"Error pushing agora deltas: {str(e)}")
+
+async def _load_agora(page: int, page_size: int, round_num: Optional[int], cursor: Optional[str],
+                      if_none_match: Optional[str] = None):
+    """构建 /agora 响应，返回 (etag, data)"""
+    cursor_key = _parse_cursor(cursor)
+    try:
+        return await run_storage_io(
+            _build_agora_response, page, page_size, round_num, cursor_key, if_none_match
+        )
     except Exception as e:
         logger.error(f"Error in get_agora: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/agora")
+async def get_agora(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    round_num: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """获取当前讨论状态，支持分页
+
+    Passing the previous response's ``nextCursor`` as ``cursor`` continues
+    from that message instead of using ``page``. Responses carry an ETag;
+    a matching ``If-None-Match`` gets a 304.
+    """
+    etag, data = await _load_agora(
+        page, page_size, round_num, cursor, request.headers.get("if-none-match")
+    )
+    concluded = bool(round_num) and round_num < DiscussionManager.get_orchestrator().current_round
+    headers = _cache_headers(etag, concluded)
+    if data is None:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(data, headers=headers)
+
 @app.websocket("/ws/agora")
 async def agora_websocket(websocket: WebSocket):
     """WebSocket endpoint for Agora messages with pagination"""
@@ -216,10 +321,11 @@ async def agora_websocket(websocket: WebSocket):
                 try:
                     message = AgoraMessage(**data)
                     if message.type == "get_messages":
-                        response = await get_agora(
+                        _, response = await _load_agora(
                             page=message.page,
                             page_size=message.page_size,
-                            round_num=message.round_num
+                            round_num=message.round_num,
+                            cursor=message.cursor
                         )
                         await websocket.send_json(response)
                     else:
@@ -237,33 +343,18 @@ async def agora_websocket(websocket: WebSocket):
     except WebSocketDisconnect:
         agora_manager.disconnect(websocket)
 
-# Get all argument nodes
-@app.get("/discussion/nodes")
-async def get_discussion_nodes():
-    """获取所有讨论节点"""
-    try:
-        orchestrator = DiscussionManager.get_orchestrator()
-        logger.info(f"Current round: {orchestrator.current_round}")
-        
-        all_nodes = []
-        current_round = orchestrator.current_round
-        
-        for round_num in range(1, current_round + 1):
-            round_data = read_round_data(round_num)
-            if not round_data or "points" not in round_data:
-                continue
-                
-            for point in round_data["points"]:
-                # 使用原始 ID
-                point_id = point.get("id")
-                if not point_id:  # 如果没有 ID 才生成
-                    timestamp = point.get("timestamp")
-                    if isinstance(timestamp, datetime):
-                        timestamp = timestamp.isoformat()
-                    elif not isinstance(timestamp, str):
-                        timestamp = datetime.utcnow().isoformat()
-                    point_id = f"point_{datetime.fromisoformat(timestamp).strftime('%Y%m%d_%H%M%S')}"
-                
+def _build_discussion_nodes(current_round: int, if_none_match: Optional[str] = None):
+    """在存储线程中同步索引并构建节点列表，返回 (etag, nodes)"""
+    all_nodes = []
+    with agora_index.lock:
+        rounds = [r for r in range(1, current_round + 1) if agora_index.sync_round(r)]
+        etag = _etag("nodes", current_round, [(r, agora_index.signature(r)) for r in rounds])
+        if _etag_matches(if_none_match, etag):
+            return etag, None
+            
+        for round_num in rounds:
+            # 节点 ID 在建立索引时已计算好
+            for point_id, point in agora_index.round_points(round_num):
                 logger.info(f"Using point ID: {point_id}")
                 
                 all_nodes.append({
@@ -274,8 +365,25 @@ async def get_discussion_nodes():
                     "agreements": point.get("agreements", []),
                     "disagreements": point.get("disagreements", [])
                 })
-            
-        return all_nodes
+    return etag, all_nodes
+
+# Get all argument nodes
+@app.get("/discussion/nodes")
+async def get_discussion_nodes(request: Request):
+    """获取所有讨论节点"""
+    try:
+        orchestrator = DiscussionManager.get_orchestrator()
+        logger.info(f"Current round: {orchestrator.current_round}")
+        
+        current_round = orchestrator.current_round
+        etag, all_nodes = await run_storage_io(
+            _build_discussion_nodes, current_round, request.headers.get("if-none-match")
+        )
+        # 当前轮次仍在进行，节点列表每次都需要验证
+        headers = _cache_headers(etag, concluded=False)
+        if all_nodes is None:
+            return Response(status_code=304, headers=headers)
+        return ORJSONResponse(all_nodes, headers=headers)
     except Exception as e:
         logger.error(f"Error in get_discussion_nodes: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -285,9 +393,11 @@ async def get_discussion_nodes():
 async def get_node_history(
     node_id: str,
     page: int = Query(1, ge=1),  # 页码，从1开始
-    page_size: int = Query(20, ge=1, le=100)  # 每页消息数，最多100条
+    page_size: int = Query(20, ge=1, le=100),  # 每页消息数，最多100条
+    cursor: Optional[str] = None  # 上一页返回的 nextCursor
 ):
     """获取特定节点的历史，支持分页"""
+    cursor_key = _parse_cursor(cursor)
     try:
         logger.info(f"Getting history for node: {node_id}, page: {page}, page_size: {page_size}")
         
@@ -295,77 +405,59 @@ async def get_node_history(
         orchestrator = DiscussionManager.get_orchestrator()
         current_round = orchestrator.current_round
         
-        # 遍历轮次查找节点
-        for round_num in range(1, current_round + 1):
-            round_data = read_round_data(round_num)
-            if not round_data:
-                continue
+        # 通过节点索引查找最早出现该节点的轮次
+        found = await run_storage_io(agora_index.find_node, node_id, current_round)
+        if found:
+            round_num, point, keys = found
+            responses = point.get("agreements", []) + point.get("disagreements", [])
+            
+            # 计算分页（keys 已按时间正序排序）
+            if cursor_key:
+                start_idx, end_idx = page_after(keys, cursor_key, page_size)
+            else:
+                start_idx = (page - 1) * page_size
+                end_idx = start_idx + page_size
+            page_keys = keys[start_idx:end_idx]
+            has_more = end_idx < len(responses)
+            
+            # 只为当前页的回复构建消息
+            messages = []
+            for key in page_keys:
+                response = responses[key[3]]
+                resp_timestamp = response.get("timestamp")
+                if isinstance(resp_timestamp, datetime):
+                    resp_timestamp = resp_timestamp.isoformat()
+                messages.append(format_message(response, resp_timestamp, round_num))
                 
-            if "points" in round_data:
-                for point in round_data["points"]:
-                    point_id = point.get("id")
-                    if not point_id:
-                        timestamp = point.get("timestamp")
-                        if isinstance(timestamp, datetime):
-                            timestamp = timestamp.isoformat()
-                        elif not isinstance(timestamp, str):
-                            timestamp = datetime.utcnow().isoformat()
-                        point_id = f"point_{datetime.fromisoformat(timestamp).strftime('%Y%m%d_%H%M%S')}"
-                    
-                    if point_id == node_id:
-                        messages = []
-                        responses = point.get("agreements", []) + point.get("disagreements", [])
-                        
-                        # 按时间正序排序
-                        responses.sort(key=lambda x: x.get("timestamp", ""))
-                        
-                        # 计算分页
-                        start_idx = (page - 1) * page_size
-                        end_idx = start_idx + page_size
-                        paginated_responses = responses[start_idx:end_idx]
-                        
-                        for response in paginated_responses:
-                            resp_timestamp = response.get("timestamp")
-                            if isinstance(resp_timestamp, datetime):
-                                resp_timestamp = resp_timestamp.isoformat()
-                            messages.append({
-                                "model": response["author"],
-                                "content": response["content"][:8000],  # 增加到 8000 字符
-                                "timestamp": resp_timestamp,
-                                "round_num": round_num
-                            })
-                            
-                        return {
-                            "messages": messages,
-                            "pagination": {
-                                "total": len(responses),
-                                "page": page,
-                                "page_size": page_size,
-                                "total_pages": (len(responses) + page_size - 1) // page_size,
-                                "has_more": end_idx < len(responses)
-                            },
-                            "roundNum": round_num
-                        }
+            return {
+                "messages": messages,
+                "pagination": {
+                    "total": len(responses),
+                    "page": page,
+                    "page_size": page_size,
+                    "total_pages": (len(responses) + page_size - 1) // page_size,
+                    "has_more": has_more
+                },
+                "nextCursor": encode_cursor(page_keys[-1]) if has_more and page_keys else None,
+                "roundNum": round_num
+            }
         
         raise HTTPException(
             status_code=404,
             detail=f"Node {node_id} not found in any round up to {current_round}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting node history: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
 def save_discussion_data(data: dict, file_path: str):
     """Save discussion data with datetime handling"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, cls=DateTimeEncoder, ensure_ascii=False, indent=2)
+        with open(file_path, 'wb') as f:
+            # orjson 原生支持 datetime，输出 UTF-8
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     except Exception as e:
         print(f"Error saving progress: {str(e)}")
 
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from .service import api_service
+
+# /api/discussion/* 接口，由 routes.py 中的 app 挂载
+router = APIRouter(prefix="/api/discussion")
+
+@router.get("/current")
+async def get_current_discussion(page: int = 1, page_size: int = 20):
+    """获取当前讨论状态
+    
+    Args:
+        page: Page number for messages (1-based)
+        page_size: Number of messages per page
+    """
+    try:
+        return await api_service.get_current_discussion(page=page, page_size=page_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/round/{round_num}")
+async def get_round_discussion(round_num: int, page: int = 1, page_size: int = 20):
+    """获取特定轮次的讨论
+    
+    Args:
+        round_num: Round number to get discussion for
+        page: Page number for messages (1-based)
+        page_size: Number of messages per page
+    """
+    try:
+        return await api_service.get_current_discussion(round_num=round_num, page=page, page_size=page_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/messages")
+async def get_more_messages(page: int = 1, page_size: int = 20):
+    """获取更多消息用于无限滚动
+    
+    Args:
+        page: Page number (1-based)
+        page_size: Number of messages per page
+    """
+    try:
+        return await api_service.get_more_messages(page=page, page_size=page_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/nodes")
+async def get_discussion_nodes():
+    """获取所有讨论节点"""
+    try:
+        return await api_service.get_discussion_nodes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/node/{node_id}/history")
+async def get_node_history(node_id: int, cursor: Optional[str] = None):
+    """获取特定节点的历史"""
+    try:
+        return await api_service.get_node_history(node_id, cursor)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
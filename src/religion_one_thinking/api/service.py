@@ -1,8 +1,8 @@
 from typing import List, Optional
 from datetime import datetime
 from ..discussion.orchestrator import DiscussionOrchestrator
-from ..discussion.discussion_chain import DiscussionChain
-from ..utils.config import load_config
+from ..discussion.discussion_chain import DiscussionChain, stable_node_id
+from ..config import load_config
 import asyncio
 from ..utils.discussion_manager import DiscussionManager
 from ..services.discussion_service import DiscussionService
@@ -18,6 +18,9 @@ class APIService:
         self.round_start_time = None
         self.round_duration = 180  # 3 minutes in seconds
         self.discussion_service = DiscussionService()
+        # 节点列表缓存，键为 (discussion_chain, discussion_chain.version)
+        self._nodes_cache: Optional[List[dict]] = None
+        self._nodes_cache_key = None
         
     async def get_current_discussion(self, round_num: Optional[int] = None, page: int = 1, page_size: int = 20) -> dict:
         """获取当前或指定轮次的讨论
@@ -56,18 +59,25 @@ class APIService:
         
     async def get_discussion_nodes(self) -> List[dict]:
         """Get all discussion nodes"""
-        if not self.discussion_chain:
+        chain = self.discussion_chain
+        if not chain:
             return []
             
+        cache_key = self._nodes_cache_key
+        if cache_key and cache_key[0] is chain and cache_key[1] == chain.version:
+            return self._nodes_cache
+            
         nodes = []
-        for point in self.discussion_chain.points:
+        for point in chain.points:
             nodes.append({
-                "id": hash(point.id),
+                "id": stable_node_id(point.id),
                 "argument": point.content[:100],
                 "size": len(point.agreements) + len(point.disagreements),
                 "roundNum": point.round_num,
                 "status": point.status
             })
+        self._nodes_cache = nodes
+        self._nodes_cache_key = (chain, chain.version)
         return nodes
         
     async def get_node_history(self, node_id: int, cursor: Optional[str] = None) -> dict:
@@ -75,16 +85,17 @@ class APIService:
         if not self.discussion_chain:
             return {"messages": [], "hasMore": False, "nextCursor": None, "roundNum": 0}
             
-        point = next((p for p in self.discussion_chain.points if hash(p.id) == node_id), None)
+        point = self.discussion_chain.get_point_by_node_id(node_id)
         if not point:
             return {"messages": [], "hasMore": False, "nextCursor": None, "roundNum": 0}
             
         messages = []
-        for response in point.agreements + point.disagreements:
+        created_at = datetime.utcnow()  # 回复没有时间戳时的兜底，每个请求只取一次
+        for response in point.iter_responses():
             messages.append({
                 "model": response["author"],
                 "content": response["content"],
-                "createdAt": datetime.utcnow(),
+                "createdAt": response.get("timestamp", created_at),
                 "roundNum": point.round_num
             })
             
@@ -93,4 +104,7 @@ class APIService:
             "hasMore": False,
             "nextCursor": None,
             "roundNum": point.round_num
-        } 
\ No newline at end of file
+        } 
+
+# 全局共享的 API 服务实例
+api_service = APIService()
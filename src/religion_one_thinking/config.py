@@ -1,12 +1,19 @@
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from .utils.config_validator import validate_config
+from .utils.config import YamlLoader
 
+@lru_cache(maxsize=1)
 def load_config():
-    """Load and validate configuration"""
+    """Load and validate configuration
+
+    The result is cached for the lifetime of the process and shared between
+    callers, so it must not be mutated. Use reload_config() to re-read it.
+    """
     config_path = Path(__file__).parent / "config" / "config.yaml"
     with open(config_path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     
     # Validate configuration
     validate_config(config)
@@ -15,4 +22,9 @@ def load_config():
     Path(config["discussion"]["save_path"]).mkdir(parents=True, exist_ok=True)
     Path(config["logging"]["file_path"]).parent.mkdir(parents=True, exist_ok=True)
     
-    return config 
\ No newline at end of file
+    return config
+
+def reload_config():
+    """Drop the cached configuration and load it again from disk"""
+    load_config.cache_clear()
+    return load_config()
\ No newline at end of file
@@ -1,12 +1,102 @@
-from typing import List, Dict, Optional, Any, Union
-from datetime import datetime
+from typing import List, Dict, Optional, Any, Union, Iterator
+from datetime import datetime, timedelta
 from pathlib import Path
-import json
+import asyncio
+import bisect
+import hashlib
+import itertools
+import orjson
+import re
+import string
+
+# 赞同标记
+AGREEMENT_MARKERS = [
+    "I agree", "I propose", "I suggest", "I consider",
+    "I observe", "Indeed", "Exactly", "True"
+]
+# 反对标记
+DISAGREEMENT_MARKERS = [
+    "I disagree", "I doubt", "I question", "I challenge",
+    "However", "On the contrary"
+]
+# 预先转为小写；str 的子串查找自带首字符过滤，比忽略大小写的正则快得多
+AGREEMENT_MARKERS_LOWER = tuple(m.lower() for m in AGREEMENT_MARKERS)
+DISAGREEMENT_MARKERS_LOWER = tuple(m.lower() for m in DISAGREEMENT_MARKERS)
+
+def classify_response(content: str) -> Optional[str]:
+    """判断回复类型：赞同返回 "agree"，反对返回 "disagree"，都不是返回 None
+
+    The content is lowercased once and shared by both marker sets;
+    agreement markers take precedence.
+    """
+    content_lower = content.lower()
+    # 普通 for 循环，省去 any() 生成器每个标记一次的恢复开销
+    for marker in AGREEMENT_MARKERS_LOWER:
+        if marker in content_lower:
+            return "agree"
+    for marker in DISAGREEMENT_MARKERS_LOWER:
+        if marker in content_lower:
+            return "disagree"
+    return None
+
+# 按问号切分回复，逐个匹配而不生成中间列表
+_QUESTION_SPLIT_RE = re.compile(r"[^?]+")
+
+# 分词前把标点替换为空格
+_PUNCT_TRANS = str.maketrans(string.punctuation, " " * len(string.punctuation))
+
+def tokenize(text: str) -> frozenset:
+    """将文本转为小写、去除标点后的词集合"""
+    return frozenset(text.lower().translate(_PUNCT_TRANS).split())
+
+# 判断回复相关性时忽略的常见停用词
+STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"
+})
+
+# 讨论点 ID = 进程启动时间 + 自增序号：同一秒内创建也不会重复，且无需每次格式化时间
+_POINT_ID_PREFIX = f"point_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+_POINT_SEQ = itertools.count()
+
+def new_point_id() -> str:
+    """生成新的讨论点 ID"""
+    return f"{_POINT_ID_PREFIX}_{next(_POINT_SEQ)}"
+
+# 上一条回复的时间戳，保证回复时间戳严格递增
+_last_response_ts = datetime.min
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+def next_response_timestamp() -> datetime:
+    """当前 UTC 时间；与上一条回复相同（或时钟回拨）时顺延 1 微秒
+
+    时间戳唯一后，按时间排序不会出现并列，分页顺序始终确定。
+    """
+    global _last_response_ts
+    now = datetime.utcnow()
+    if now <= _last_response_ts:
+        now = _last_response_ts + _ONE_MICROSECOND
+    _last_response_ts = now
+    return now
+
+def stable_node_id(point_id: str) -> int:
+    """由讨论点 ID 生成对外使用的数字节点 ID
+
+    Unlike hash(), this is the same in every process. 48 bits keeps the
+    value within JavaScript's safe integer range.
+    """
+    return int.from_bytes(hashlib.blake2b(point_id.encode("utf-8"), digest_size=6).digest(), "big")
 
 class DiscussionPoint:
     """讨论点节点"""
+    # 长时间讨论会创建大量讨论点，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = (
+        "id", "content", "round_num", "parent_id", "status", "conclusion",
+        "agreements", "disagreements", "_n_agree", "_n_disagree",
+        "participants", "_keyword_source", "_keywords"
+    )
+    
     def __init__(self, content: str, round_num: int, parent_id: Optional[str] = None):
-        self.id = f"point_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        self.id = new_point_id()
         self.content = content
         self.round_num = round_num
         self.parent_id = parent_id
@@ -14,60 +104,89 @@ class DiscussionPoint:
         self.conclusion = None
         self.agreements = []
         self.disagreements = []
-        self.consensus_score = 0.0
+        # 赞同/反对数量，随 add_response 递增
+        self._n_agree = 0
+        self._n_disagree = 0
         self.participants = set()
+        self._keyword_source = None
+        self._keywords = frozenset()
+        
+    @property
+    def keywords(self) -> frozenset:
+        """内容中的关键词（小写、去除标点和停用词），内容变化时才重新计算"""
+        if self._keyword_source != self.content:
+            self._keywords = tokenize(self.content) - STOPWORDS
+            self._keyword_source = self.content
+        return self._keywords
+        
+    @property
+    def consensus_score(self) -> float:
+        """共识分数：赞同回复所占比例"""
+        total_responses = self._n_agree + self._n_disagree
+        return self._n_agree / total_responses if total_responses else 0.0
         
     def add_response(self, response: Dict[str, Any]):
         """添加 AI 的回复"""
-        try:
-            author = response["author"]
-            content = response["content"]
-            self.participants.add(author)
-            
-            # 分析回复类型
-            if self._is_agreement(content):
-                self.agreements.append({
-                    "author": author,
-                    "content": content,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            else:
-                self.disagreements.append({
-                    "author": author,
-                    "content": content,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-            # 更新共识状态
-            self._update_consensus()
+        author = response["author"]
+        content = response["content"]
+        self.participants.add(author)
+        # 保存 datetime 对象，序列化时再转成 ISO 字符串
+        now = next_response_timestamp()
+        
+        # 分析回复类型
+        # 不属于赞同的回复都记为反对，因此只需检查赞同标记
+        if self._is_agreement(content):
+            self.agreements.append({
+                "author": author,
+                "content": content,
+                "timestamp": now
+            })
+            self._n_agree += 1
+        else:
+            self.disagreements.append({
+                "author": author,
+                "content": content,
+                "timestamp": now
+            })
+            self._n_disagree += 1
             
-        except Exception as e:
-            print(f"Error adding response to point: {str(e)}")
-            raise
+        # 更新共识状态
+        self._update_consensus()
             
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """依次遍历赞同和反对回复，不拼接新列表"""
+        return itertools.chain(self.agreements, self.disagreements)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可保存的字典"""
+        return {
+            "id": self.id,
+            "content": self.content,
+            "round_num": self.round_num,
+            "parent_id": self.parent_id,
+            "status": self.status,
+            "conclusion": self.conclusion,
+            "consensus_score": self.consensus_score,
+            "agreements": self.agreements,
+            "disagreements": self.disagreements,
+            "participants": list(self.participants)
+        }
+        
     def _is_agreement(self, content: str) -> bool:
         """检查是否为赞同回复"""
-        agreement_markers = [
-            "I agree", "I propose", "I suggest", "I consider",
-            "I observe", "Indeed", "Exactly", "True"
-        ]
-        return any(marker.lower() in content.lower() for marker in agreement_markers)
+        content_lower = content.lower()
+        return any(marker in content_lower for marker in AGREEMENT_MARKERS_LOWER)
         
     def _update_consensus(self):
         """更新共识状态"""
-        if not self.participants:
+        # 少于 3 位参与者时不可能结束，无需计算
+        if len(self.participants) < 3:
             return
             
-        # 计算共识分数
-        total_responses = len(self.agreements) + len(self.disagreements)
-        if total_responses > 0:
-            agreement_ratio = len(self.agreements) / total_responses
-            self.consensus_score = agreement_ratio
-            
-            # 如果达到一定共识，标记为已结束
-            if len(self.participants) >= 3 and agreement_ratio > 0.7:
-                self.status = "concluded"
-                self._generate_conclusion()
+        # 如果达到一定共识，标记为已结束
+        if self.consensus_score > 0.7:
+            self.status = "concluded"
+            self._generate_conclusion()
                 
     def _generate_conclusion(self):
         """生成结论"""
@@ -78,68 +197,124 @@ class DiscussionPoint:
 class DiscussionChain:
     """管理讨论链"""
     def __init__(self, initial_question: str):
+        self.points: List[DiscussionPoint] = []
+        # stable_node_id(point.id) -> point，ID 重复时保留最早的讨论点
+        self._by_node_id: Dict[int, DiscussionPoint] = {}
+        # content -> point，内容重复时保留最早的讨论点
+        self._by_content: Dict[str, DiscussionPoint] = {}
+        # 按状态索引讨论点，均保持创建顺序；状态变化在 _respond 中维护
+        self._positions: Dict[DiscussionPoint, int] = {}
+        self._active: Dict[DiscussionPoint, None] = {}
+        self._concluded: List[DiscussionPoint] = []
+        # round_num -> 该轮创建的讨论点（创建顺序），按轮次取消息时不必扫描全部讨论点
+        self._by_round: Dict[int, List[DiscussionPoint]] = {}
+        # 每次讨论点或回复变化时递增，供读取方判断缓存是否失效
+        self.version = 0
         # 初始问题是第一轮的讨论点
-        self.points = [DiscussionPoint(initial_question, round_num=1)]
+        self._add_point(DiscussionPoint(initial_question, round_num=1))
+
+    def _add_point(self, point: DiscussionPoint):
+        """添加讨论点并更新索引"""
+        self.points.append(point)
+        self._by_node_id.setdefault(stable_node_id(point.id), point)
+        self._by_content.setdefault(point.content, point)
+        self._positions[point] = len(self.points) - 1
+        self._by_round.setdefault(point.round_num, []).append(point)
+        if point.status == "concluded":
+            self._insert_concluded(point)
+        else:
+            self._active[point] = None
+
+    def _insert_concluded(self, point: DiscussionPoint):
+        """按创建顺序插入已结束的讨论点"""
+        bisect.insort(self._concluded, point, key=self._positions.__getitem__)
+
+    def _respond(self, point: DiscussionPoint, response: dict):
+        """向讨论点添加回复，讨论点结束时更新状态索引"""
+        point.add_response(response)
+        if point.status == "concluded" and point in self._active:
+            del self._active[point]
+            self._insert_concluded(point)
+
+    def get_point_by_node_id(self, node_id: int) -> Optional[DiscussionPoint]:
+        """根据 stable_node_id(point.id) 查找讨论点"""
+        return self._by_node_id.get(node_id)
+
+    def get_round_points(self, round_num: int) -> List[DiscussionPoint]:
+        """获取某一轮创建的讨论点，保持创建顺序"""
+        return list(self._by_round.get(round_num, ()))
 
     def get_active_points(self) -> List[DiscussionPoint]:
         """获取仍在讨论中的点"""
-        return [p for p in self.points if p.status == "ongoing"]
+        return list(self._active)
 
     def get_concluded_points(self) -> List[DiscussionPoint]:
         """获取已达成结论的点"""
-        return [p for p in self.points if p.status == "concluded"]
+        return list(self._concluded)
 
     def add_response(self, point: Union[str, DiscussionPoint], response: dict):
         """添加回复到讨论点"""
-        try:
-            if isinstance(point, str):
-                existing_point = next(
-                    (p for p in self.points if p.content == point), 
-                    None
+        if isinstance(point, str):
+            existing_point = self._by_content.get(point)
+            if existing_point:
+                point = existing_point
+            else:
+                point = DiscussionPoint(
+                    content=point,
+                    round_num=response.get("round_num", 1)
                 )
-                if existing_point:
-                    point = existing_point
-                else:
-                    point = DiscussionPoint(
-                        content=point,
-                        round_num=response.get("round_num", 1)
-                    )
-                    self.points.append(point)
-            
-            # 添加响应并更新状态
-            point.add_response(response)
-            
-        except Exception as e:
-            print(f"Error adding response: {str(e)}")
-            raise
+                self._add_point(point)
+        
+        # 添加响应并更新状态
+        self._respond(point, response)
+        self.version += 1
 
     async def analyze_round(self, round_num: int, responses: List[Dict[str, str]]):
-        """分析一轮讨论"""
-        try:
-            # 更新现有讨论点
-            for point in self.get_active_points():
-                relevant_responses = [
-                    r for r in responses 
-                    if self._is_response_relevant(point.content, r["content"])
-                ]
-                for response in relevant_responses:
-                    point.add_response(response)
-            
-            # 提取新的讨论点
-            new_points = self._extract_new_points(responses, round_num)
-            self.points.extend(new_points)
-            
-        except Exception as e:
-            print(f"Error analyzing round: {str(e)}")
-            raise
-
-    def _is_response_relevant(self, point_content: str, response_content: str) -> bool:
-        """检查回复是否与讨论点相关"""
-        # 提取关键词（去除常见停用词）
-        keywords = set(point_content.lower().split()) - {
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"
-        }
-        return any(keyword in response_content.lower() for keyword in keywords)
+        """分析一轮讨论，纯计算部分在线程中执行，不阻塞事件循环"""
+        await asyncio.to_thread(self._analyze_round_sync, round_num, responses)
+
+    def _analyze_round_sync(self, round_num: int, responses: List[Dict[str, str]]):
+        """分析一轮讨论（同步）"""
+        # 每条回复只分词一次，供所有讨论点复用
+        response_tokens = [tokenize(r["content"]) for r in responses]
+        
+        # 更新现有讨论点
+        active_points = self.get_active_points()
+        masks = self._relevance_masks(active_points, response_tokens)
+        for i, point in enumerate(active_points):
+            bit = 1 << i
+            relevant_responses = [
+                r for r, mask in zip(responses, masks) if mask & bit
+            ]
+            for response in relevant_responses:
+                self._respond(point, response)
+        
+        # 提取新的讨论点
+        new_points = self._extract_new_points(responses, round_num)
+        for new_point in new_points:
+            self._add_point(new_point)
+        self.version += 1
+
+    def _relevance_masks(self, points: List[DiscussionPoint], responses_tokens: List[frozenset]) -> List[int]:
+        """批量判断相关性，返回每条回复的位掩码，第 i 位表示与 points[i] 相关
+
+        Builds one keyword -> bitmask table over the points. Each response is
+        intersected with the keyword set in C, so the Python loop only runs
+        over the tokens that actually hit a keyword.
+        """
+        keyword_masks: Dict[str, int] = {}
+        for i, point in enumerate(points):
+            for keyword in point.keywords:
+                keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << i)
+        all_keywords = frozenset(keyword_masks)
+                
+        masks = []
+        for tokens in responses_tokens:
+            mask = 0
+            for keyword in all_keywords.intersection(tokens):
+                mask |= keyword_masks[keyword]
+            masks.append(mask)
+        return masks
 
     def _extract_new_points(self, responses: List[Dict[str, str]], round_num: int) -> List[DiscussionPoint]:
         """从回复中提取新的讨论点"""
@@ -147,33 +322,43 @@ class DiscussionChain:
         for response in responses:
             # 寻找问题句（以问号结尾的句子）
             content = response["content"]
-            questions = [s.strip() + "?" for s in content.split("?") if s.strip()]
-            
-            for question in questions:
-                if not any(p.content == question for p in self.points):
+            for match in _QUESTION_SPLIT_RE.finditer(content):
+                sentence = match.group().strip()
+                if not sentence:
+                    continue
+                question = sentence + "?"
+                if question not in self._by_content:
                     new_points.append(DiscussionPoint(question, round_num=round_num))
                     
         return new_points
 
     def save_chain(self, path: str = "discussion_chain.json"):
-        """保存讨论链"""
-        chain_data = {
-            "points": [point.to_dict() for point in self.points]
-        }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(chain_data, f, ensure_ascii=False, indent=2)
+        """保存讨论链
+
+        Points are serialized and written one at a time, so the whole chain
+        is never held as a second in-memory copy.
+        """
+        with open(path, "wb") as f:
+            f.write(b'{"points": [')
+            for i, point in enumerate(self.points):
+                if i:
+                    f.write(b",")
+                f.write(b"\n")
+                # orjson 原生序列化 datetime，输出 UTF-8
+                f.write(orjson.dumps(point.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            f.write(b"\n]}\n")
 
     def get_discussion_summary(self) -> Dict[str, Any]:
         """获取讨论总结"""
         return {
             "total_points": len(self.points),
-            "concluded_points": len(self.get_concluded_points()),
-            "active_points": len([p for p in self.points if p.status == "ongoing"]),
+            "concluded_points": len(self._concluded),
+            "active_points": len(self._active),
             "latest_conclusions": [
                 {
                     "point": p.content,
                     "conclusion": p.conclusion
                 }
-                for p in self.get_concluded_points()[-3:]  # 最近3个结论
+                for p in self._concluded[-3:]  # 最近3个结论
             ]
         } 
\ No newline at end of file
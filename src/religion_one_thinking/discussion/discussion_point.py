@@ -1,10 +1,17 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Set, Iterable
 from datetime import datetime
+from .discussion_chain import new_point_id, classify_response
 
 class DiscussionPoint:
     """Discussion point node"""
-    def __init__(self, content: str, round_num: int, timestamp: datetime = None, agreements: List[Dict] = None, disagreements: List[Dict] = None, participants: List[str] = None):
-        self.id = f"point_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+    __slots__ = (
+        "id", "content", "round_num", "timestamp", "status", "conclusion",
+        "discussion_refs", "agreements", "disagreements", "consensus_score",
+        "participants", "point_type"
+    )
+
+    def __init__(self, content: str, round_num: int, timestamp: datetime = None, agreements: List[Dict] = None, disagreements: List[Dict] = None, participants: Optional[Iterable[str]] = None):
+        self.id = new_point_id()
         self.content = content  # 移除前缀，保持原始内容
         self.round_num = round_num
         self.timestamp = timestamp or datetime.utcnow()
@@ -14,7 +21,7 @@ class DiscussionPoint:
         self.agreements = agreements or []
         self.disagreements = disagreements or []
         self.consensus_score = 0.0
-        self.participants = participants or []
+        self.participants: Set[str] = set(participants) if participants else set()
         self.point_type = None
 
     def __str__(self):
@@ -29,12 +36,24 @@ class DiscussionPoint:
         content = response["content"]
         self.participants.add(author)
         
-        # Analyze response type
-        if self._is_agreement(content):
+        # Analyze response type with a single classification
+        response_type = classify_response(content)
+        if response_type == "agree":
             self.agreements.append({"author": author, "content": content})
-        elif self._is_disagreement(content):
+        elif response_type == "disagree":
             self.disagreements.append({"author": author, "content": content})
             
         self._calculate_consensus()
 
-    # ... (其他方法保持不变) 
\ No newline at end of file
+    def _calculate_consensus(self):
+        """共识分数：赞同回复所占比例"""
+        total_responses = len(self.agreements) + len(self.disagreements)
+        self.consensus_score = len(self.agreements) / total_responses if total_responses else 0.0
+
+    def _is_agreement(self, content: str) -> bool:
+        """Check whether a response agrees"""
+        return classify_response(content) == "agree"
+
+    def _is_disagreement(self, content: str) -> bool:
+        """Check whether a response disagrees"""
+        return classify_response(content) == "disagree"
@@ -1,10 +1,16 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+import itertools
+import random
+from collections import OrderedDict, deque
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 from datetime import datetime
-import json
-from ..thinkers.base_thinker import BaseThinker
+import orjson
+from ..thinkers.base_thinker import BaseThinker, is_transient_error
 from rich.console import Console
+from rich.markup import escape
 from ..config import load_config
 from ..utils.logger import DiscussionLogger
 from ..utils.memory_agent import MemoryAgent
@@ -14,14 +20,40 @@ import logging
 from ..thinkers.context_processor import ContextProcessor
 from ..thinkers import GPTThinker, ClaudeThinker, GeminiThinker, DeepSeekThinker, QwenThinker
 import os
+import httpx
 from ..utils.key_manager import KeyManager
 from ..utils.discussion_manager import DiscussionManager
-from ..utils.file_utils import read_round_data
+from ..utils.file_utils import read_round_data, round_file_signature
+from ..utils.storage_pool import run_storage_io
+from ..utils.discussion_storage import DiscussionStorage
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 讨论总结缓存的最大条目数
+SUMMARY_CACHE_SIZE = 64
+
+# 在内存中保留最近几轮的回复内容；缓存没有命中时（如更早的轮次）从 discussion_chain 重新收集
+RECENT_ROUNDS_KEPT = 4
+
+# thinker 调用的重试参数：指数退避 + 随机抖动
+THINK_MAX_ATTEMPTS = 4
+THINK_MAX_BACKOFF = 20
+
+# orjson 原生支持 datetime（输出与 isoformat 相同），不再需要自定义 encoder
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+def _write_json_sync(path: Path, data: Any):
+    """写入 JSON 文件（阻塞，在存储线程池中调用）
+
+    先写临时文件再 os.replace，读取方不会看到写了一半的文件。
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(data, option=_JSON_OPTIONS))
+    os.replace(tmp_path, path)
+
 class DiscussionOrchestrator:
     """
     Orchestrates the multi-AI discussion process.
@@ -39,28 +71,77 @@ class DiscussionOrchestrator:
     """
 
     def __init__(self):
-        # 从 key_manager 获取一个 key
-        key_manager = DiscussionManager.get_key_manager()  # 使用 DiscussionManager
-        api_key = key_manager.get_current_key()
-
-        self.thinkers = [
-            GPTThinker(api_key=api_key),
-            ClaudeThinker(api_key=api_key),
-            GeminiThinker(api_key=api_key),
-            DeepSeekThinker(api_key=api_key),
-            QwenThinker(api_key=api_key)
-        ]
+        self.config = load_config()
+        # 每个模型提供方一个信号量，限制同时在途的请求数，不同提供方互不阻塞
+        self._provider_limit = self.config["api"]["openrouter"].get("max_concurrent_per_provider", 4)
+        self._provider_sems: Dict[str, asyncio.Semaphore] = {}
+        # HTTP 客户端、thinkers 和 context_processor 在第一次使用时才创建，
+        # 只读取讨论文件的调用方（如 API 进程）不需要 API key、连接池和模型客户端
         self.discussion_chain = None
         self.logger = DiscussionLogger()
+        self.console = Console()
         self.current_round = 0
         self.round_start_time = None
         self.round_duration = 180  # 3 minutes
-        self.config = load_config()
         self.max_rounds = self.config["discussion"]["max_rounds"]
         self.initial_question = None
-        self.context_processor = ContextProcessor(api_key=api_key)
+        # 讨论总结缓存：同一组回复（或同一版本的轮次文件）只总结一次
+        self._summary_cache: OrderedDict = OrderedDict()
+        # 最近几轮的 (round_num, 回复内容列表)，每轮结束时追加
+        self._recent_responses: deque = deque(maxlen=RECENT_ROUNDS_KEPT)
+        # 活跃讨论点缓存，键为 (discussion_chain, discussion_chain.version)
+        self._active_cache: List[DiscussionPoint] = []
+        self._active_cache_key = None
         self.discussion_dir = "discussions"  # 确保这个路径是正确的
+        self.save_path = Path(self.config["discussion"]["save_path"])
+        # 讨论状态文件名的序号，同一秒内多次保存也不会互相覆盖
+        self._state_seq = itertools.count()
+        # 只追加的 SQLite 存储，每轮只写入增量
+        self.storage = DiscussionStorage(self.discussion_dir)
+        # 单次 thinker 调用的超时，防止一个卡住的请求拖住整轮
+        self._think_timeout = self.config["api"]["openrouter"].get("think_timeout", 180)
         
+    @cached_property
+    def _http(self) -> httpx.AsyncClient:
+        """所有 thinker 共用的 HTTP 客户端，第一次访问时创建
+
+        复用 keep-alive 连接和 TLS 会话。保活连接数按最大在途请求数（每个模型一个提供方）设置，
+        否则一轮并发结束后多出的连接被关闭，下一轮又要重新握手。
+        """
+        max_in_flight = self._provider_limit * len(self.config["models"])
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max(64, max_in_flight),
+                                max_keepalive_connections=max_in_flight),
+            timeout=httpx.Timeout(60.0)
+        )
+
+    @cached_property
+    def thinkers(self) -> List[BaseThinker]:
+        """参与讨论的 AI，第一次访问时创建"""
+        # 从 key_manager 获取一个 key
+        api_key = DiscussionManager.get_key_manager().get_current_key()  # 使用 DiscussionManager
+        return [
+            GPTThinker(api_key=api_key, http_client=self._http),
+            ClaudeThinker(api_key=api_key, http_client=self._http),
+            GeminiThinker(api_key=api_key, http_client=self._http),
+            DeepSeekThinker(api_key=api_key, http_client=self._http),
+            QwenThinker(api_key=api_key, http_client=self._http)
+        ]
+
+    @cached_property
+    def context_processor(self) -> ContextProcessor:
+        """总结讨论用的 context processor，第一次访问时创建"""
+        api_key = DiscussionManager.get_key_manager().get_current_key()
+        return ContextProcessor(api_key=api_key, http_client=self._http)
+
+    async def aclose(self):
+        """关闭共享的 HTTP 客户端和 SQLite 写连接；之后的请求会退回到 BaseThinker 的兜底客户端"""
+        # 没创建过客户端（只读调用方）时不需要关闭
+        http = self.__dict__.get("_http")
+        if http is not None:
+            await http.aclose()
+        self.storage.close()
+
     async def initialize(self, initial_question: str):
         """Initialize discussion with question"""
         self.initial_question = initial_question
@@ -73,23 +154,27 @@ class DiscussionOrchestrator:
         """Get current discussion state"""
         try:
             # 获取当前活跃的讨论点
-            active_points = self.discussion_chain.get_active_points() if self.discussion_chain else []
+            active_points = self._active_points() if self.discussion_chain else []
             
             # 获取当前轮次的所有消息
             messages = []
-            for point in self.discussion_chain.points:  # 从所有点中获取消息
-                if point.round_num == self.current_round:  # 只获取当前轮次的消息
-                    for response in point.agreements + point.disagreements:
-                        messages.append({
-                            "model": response["author"],
-                            "content": response["content"],
-                            "timestamp": datetime.utcnow()
-                        })
+            now = datetime.utcnow()
+            for point in self.discussion_chain.get_round_points(self.current_round):  # 只获取当前轮次的消息
+                for response in point.iter_responses():
+                    messages.append({
+                        "model": response["author"],
+                        "content": response["content"],
+                        # 使用回复写入时的时间戳，而不是读取时间
+                        "timestamp": response.get("timestamp", now)
+                    })
             
-            # 添加调试信息
-            print(f"Current round: {self.current_round}")
-            print(f"Number of messages: {len(messages)}")
-            print(f"Active points: {[p.content for p in active_points]}")
+            # 调试信息，生产环境默认不输出
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Current round: {self.current_round}, "
+                    f"number of messages: {len(messages)}, "
+                    f"active points: {[p.content for p in active_points]}"
+                )
             
             return {
                 "status": "ongoing" if self.discussion_chain else "not_started",
@@ -98,26 +183,63 @@ class DiscussionOrchestrator:
                 "remaining_time": 0  # 移除时间计算，因为不再需要
             }
         except Exception as e:
-            print(f"Error in get_current_state: {str(e)}")  # 添加错误日志
+            logger.error(f"Error in get_current_state: {str(e)}")
             raise Exception(f"Error getting current state: {str(e)}")
         
+    def _active_points(self) -> List[DiscussionPoint]:
+        """当前活跃的讨论点，讨论链版本不变时复用上次的结果（只读，不要修改）"""
+        chain = self.discussion_chain
+        cache_key = (chain, chain.version)
+        if self._active_cache_key != cache_key:
+            self._active_cache = chain.get_active_points()
+            self._active_cache_key = cache_key
+        return self._active_cache
+
     def _get_current_messages(self) -> List[dict]:
         """Get messages from current round"""
         messages = []
-        for point in self.discussion_chain.get_active_points():
-            if point.round_num == self.current_round:
-                for response in point.agreements + point.disagreements:
-                    messages.append({
-                        "model": response["author"],
-                        "content": response["content"],
-                        "timestamp": datetime.utcnow()
-                    })
+        now = datetime.utcnow()
+        for point in self.discussion_chain.get_round_points(self.current_round):
+            if point.status == "concluded":
+                continue
+            for response in point.iter_responses():
+                messages.append({
+                    "model": response["author"],
+                    "content": response["content"],
+                    "timestamp": response.get("timestamp", now)
+                })
         return messages
 
+    async def _throttled_think(self, thinker: BaseThinker, point: str, round_num: int) -> Dict[str, str]:
+        """在所属提供方的信号量内调用 thinker.think"""
+        sem = self._provider_sems.get(thinker.provider_key)
+        if sem is None:
+            sem = self._provider_sems[thinker.provider_key] = asyncio.Semaphore(self._provider_limit)
+        async with sem:
+            return await thinker.think(point, round_num)
+
+    async def _think_with_retry(self, thinker: BaseThinker, point: str, round_num: int) -> Dict[str, str]:
+        """带超时和指数退避重试的 thinker 调用，仅重试临时性错误"""
+        for attempt in range(THINK_MAX_ATTEMPTS):
+            try:
+                return await asyncio.wait_for(
+                    self._throttled_think(thinker, point, round_num),
+                    timeout=self._think_timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == THINK_MAX_ATTEMPTS - 1 or not is_transient_error(e):
+                    raise
+                delay = min(2 ** attempt + random.random(), THINK_MAX_BACKOFF)
+                logger.warning(f"{thinker.name} failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+                # 退避时不占用提供方信号量
+                await asyncio.sleep(delay)
+
     async def _safe_think(self, thinker: BaseThinker, point: str, round_num: int) -> Dict[str, str]:
         """Safely execute a thinker's response"""
         try:
-            response = await thinker.think(point, round_num)
+            response = await self._think_with_retry(thinker, point, round_num)
             if response and isinstance(response, dict):
                 return response
             
@@ -127,12 +249,61 @@ class DiscussionOrchestrator:
             self.console.print(f"[red]{error_msg}[/]")
             return None
 
+    async def _summary_cache_key(self, source: Union[List[str], int]) -> Optional[str]:
+        """回复列表按内容哈希；轮次号按轮次文件的 mtime/size，文件不存在时不缓存"""
+        if isinstance(source, list):
+            joined = "\0".join(sorted(str(p) for p in source))
+            return hashlib.blake2b(joined.encode("utf-8")).hexdigest()
+        data = await run_storage_io(read_round_data, source)
+        signature = round_file_signature(source, data) if data else None
+        if signature is None:
+            return None
+        return f"round:{source}:{signature[0]}:{signature[1]}"
+
+    async def _summarize(self, source: Union[List[str], int],
+                         context_processor: Optional[ContextProcessor] = None) -> str:
+        """带缓存的 context_processor.summarize_discussion"""
+        key = await self._summary_cache_key(source)
+        if key is not None and key in self._summary_cache:
+            self._summary_cache.move_to_end(key)
+            return self._summary_cache[key]
+        
+        processor = context_processor or self.context_processor
+        summary = await processor.summarize_discussion(source)
+        if key is not None and summary:
+            self._summary_cache[key] = summary
+            if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return summary
+
+    async def _assigned_think(self, thinker: BaseThinker, point: str, round_num: int) -> tuple:
+        """返回 (thinker, point, 回复或异常)，供 as_completed 按完成顺序处理"""
+        try:
+            return thinker, point, await self._think_with_retry(thinker, point, round_num)
+        except Exception as e:
+            return thinker, point, e
+
+    async def _gather_thinkers(self, assignments: List[tuple], round_num: int) -> List[Optional[Dict[str, str]]]:
+        """并发执行 (thinker, point) 列表，按输入顺序返回结果，失败的位置为 None"""
+        tasks = [
+            asyncio.create_task(self._safe_think(thinker, point, round_num))
+            for thinker, point in assignments
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return [None if isinstance(r, BaseException) else r for r in results]
+
     async def _discuss_point(self, point: str, round_num: int) -> List[Dict[str, str]]:
         """Discuss a single point"""
+        self.console.print("\n".join(
+            f"\n[bold blue]🤖 {thinker.name} discussing: {escape(str(point))}[/]" for thinker in self.thinkers
+        ))
+        # 所有 thinker 并发请求，总耗时约等于最慢的那一个
+        results = await self._gather_thinkers(
+            [(thinker, point) for thinker in self.thinkers], round_num
+        )
+        
         responses = []
-        for thinker in self.thinkers:
-            self.console.print(f"\n[bold blue]🤖 {thinker.name} discussing: {point}[/]")
-            response = await self._safe_think(thinker, point, round_num)
+        for thinker, response in zip(self.thinkers, results):
             if response:
                 responses.append(response)
                 # Save to memory
@@ -141,21 +312,19 @@ class DiscussionOrchestrator:
                     author=response["author"],
                     round_num=round_num
                 )
-                # Add short delay to avoid API rate limits
-                await asyncio.sleep(0.5)
         return responses
 
     async def conduct_round(self, round_num: int) -> List[Dict[str, str]]:
         """Conduct one round of discussion"""
         all_responses = []
-        active_points = self.discussion_chain.get_active_points()
+        active_points = self._active_points()
         
         for point in active_points:
             responses = await self._discuss_point(point, round_num)
             all_responses.extend(responses)
             
         # Update discussion chain
-        self.discussion_chain.analyze_round(round_num, all_responses)
+        await self.discussion_chain.analyze_round(round_num, all_responses)
         
         # Save discussion chain
         self.discussion_chain.save_chain(f"discussions/chain_{round_num}.json")
@@ -167,22 +336,21 @@ class DiscussionOrchestrator:
 
     def _enhance_prompt(self, original_prompt: str, discussion_state: Dict[str, Any]) -> str:
         """增强提示，引导讨论方向"""
-        enhanced = f"{original_prompt}\n\n"
+        # 先收集片段再一次性拼接，避免反复 += 复制整个字符串
+        parts = [f"{original_prompt}\n\n"]
         
         if discussion_state["resolved_points"]:
-            enhanced += "\nResolved points (no need to discuss further):\n"
-            for point, conclusion in discussion_state["resolved_points"].items():
-                enhanced += f"- {point}\n"
+            parts.append("\nResolved points (no need to discuss further):\n")
+            parts.extend(f"- {point}\n" for point in discussion_state["resolved_points"])
         
         if discussion_state["unresolved_points"]:
-            enhanced += "\nPoints that need further discussion:\n"
-            for point in discussion_state["unresolved_points"]:
-                enhanced += f"- {point}\n"
+            parts.append("\nPoints that need further discussion:\n")
+            parts.extend(f"- {point}\n" for point in discussion_state["unresolved_points"])
             
         if discussion_state["suggested_focus"]:
-            enhanced += f"\nSuggested focus for this round:\n{discussion_state['suggested_focus']}"
+            parts.append(f"\nSuggested focus for this round:\n{discussion_state['suggested_focus']}")
         
-        return enhanced
+        return "".join(parts)
 
     async def conduct_discussion(self):
         """Conduct the discussion process"""
@@ -199,23 +367,27 @@ class DiscussionOrchestrator:
                 self.console.print(f"\n[cyan]Current Topic:[/]\n{current_topic}\n")
                 
                 # Collect responses from thinkers
+                self.console.print("\n".join(
+                    f"\n[bold blue]🤖 {thinker.name} is thinking...[/]" for thinker in self.thinkers
+                ))
+                results = await self._gather_thinkers(
+                    [(thinker, current_topic) for thinker in self.thinkers], round_num
+                )
+                
                 responses = []
-                for thinker in self.thinkers:
-                    self.console.print(f"\n[bold blue]🤖 {thinker.name} is thinking...[/]")
-                    response = await self._safe_think(thinker, current_topic, round_num)
+                for thinker, response in zip(self.thinkers, results):
                     if response:
                         responses.append(response)
-                        self.logger.log_thinker_response(
-                            thinker.name, 
+                        self.logger.log_response(
+                            thinker.name,
+                            current_topic,
                             response["content"]
                         )
                 
                 # Process responses and update topic for next round
                 if responses:
                     discussion_points = [r["content"] for r in responses]
-                    round_summary = await self.context_processor.summarize_discussion(
-                        discussion_points
-                    )
+                    round_summary = await self._summarize(discussion_points)
                     self.logger.log_summary(round_num, round_summary)
                     
                     # Update topic for next round
@@ -226,7 +398,7 @@ class DiscussionOrchestrator:
                     )
                 
                 # Save progress
-                self._save_round_progress(round_num, responses)
+                await self._save_round_progress(round_num)
                 
                 # Display round results
                 self._print_round_results(round_num, round_start_time)
@@ -238,18 +410,20 @@ class DiscussionOrchestrator:
             self.logger.log_error(error_msg)
             self.console.print(f"[red]{error_msg}[/]")
             raise
+        finally:
+            await self.aclose()
         
     async def load_thesis(self) -> str:
         """Load the discussion thesis."""
         thesis_path = Path("src/religion_one_thinking/thesis.txt")
-        return thesis_path.read_text(encoding="utf-8")
+        return await run_storage_io(thesis_path.read_text, encoding="utf-8")
         
     async def load_description(self) -> str:
         """Load the discussion description."""
         desc_path = Path("src/religion_one_thinking/description.txt")
-        return desc_path.read_text(encoding="utf-8")
+        return await run_storage_io(desc_path.read_text, encoding="utf-8")
 
-    def save_discussion_state(self, round_num: int, responses: List[Dict[str, str]]):
+    async def save_discussion_state(self, round_num: int, responses: List[Dict[str, str]]):
         """
         Save the current discussion state.
         
@@ -258,7 +432,7 @@ class DiscussionOrchestrator:
             responses: List of AI responses
         """
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        save_file = self.save_path / f"discussion_round_{round_num}_{timestamp}.json"
+        save_file = self.save_path / f"discussion_round_{round_num}_{timestamp}_{next(self._state_seq):04d}.json"
         
         state = {
             "round": round_num,
@@ -267,50 +441,49 @@ class DiscussionOrchestrator:
             "discussion_summary": self.discussion_chain.get_discussion_summary()
         }
         
-        with open(save_file, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        await asyncio.shield(run_storage_io(_write_json_sync, save_file, state))
             
         self.console.print(f"[blue]Discussion state saved to {save_file}[/]")
 
     def _print_discussion_status(self, round_num: int):
         """Print current discussion status"""
-        active_points = self.discussion_chain.get_active_points()
-        concluded_points = [p for p in self.discussion_chain.points 
-                           if p.status == "concluded"]
+        active_points = self._active_points()
+        concluded_points = self.discussion_chain.get_concluded_points()
         
-        self.console.print(f"\n[bold]===== Round {round_num} Status =====[/]")
+        # 先拼好整段输出，只调用一次 console.print
+        lines = [f"\n[bold]===== Round {round_num} Status =====[/]"]
         
         if concluded_points:
-            self.console.print("\n[green]Concluded Points:[/]")
-            for point in concluded_points:
-                self.console.print(f"✓ {point.content}")
+            lines.append("\n[green]Concluded Points:[/]")
+            lines.extend(f"✓ {escape(point.content)}" for point in concluded_points)
         
         if active_points:
-            self.console.print("\n[yellow]Active Points for Discussion:[/]")
-            for point in active_points:
-                self.console.print(f"• {point}")
+            lines.append("\n[yellow]Active Points for Discussion:[/]")
+            lines.extend(f"• {escape(point.content)}" for point in active_points)
         
-        self.console.print("\n" + "=" * 50 + "\n")
+        lines.append("\n" + "=" * 50 + "\n")
+        self.console.print("\n".join(lines))
 
     def _print_round_status(self, round_num: int, points: List[Any]):
         """Display the current round status"""
-        self.console.print(f"\n[bold green]Round {round_num + 1}[/]")
-        self.console.print("\n[cyan]Discussion Points:[/]")
-        for point in points:
-            self.console.print(f"• {point.content[:100]}...")
+        lines = [f"\n[bold green]Round {round_num + 1}[/]", "\n[cyan]Discussion Points:[/]"]
+        lines.extend(f"• {escape(point.content[:100])}..." for point in points)
+        self.console.print("\n".join(lines))
 
     def _print_round_results(self, round_num: int, start_time: datetime):
         """Display the results of a discussion round"""
         duration = datetime.now() - start_time
-        self.console.print(f"\n[green]Round {round_num + 1} completed in {duration.total_seconds():.2f}s[/]")
+        lines = [f"\n[green]Round {round_num + 1} completed in {duration.total_seconds():.2f}s[/]"]
         
         # Show conclusions if any
         concluded_points = self.discussion_chain.get_concluded_points()
         if concluded_points:
-            self.console.print("\n[yellow]Conclusions reached:[/]")
-            for point in concluded_points:
-                if point.conclusion:
-                    self.console.print(f"✓ {point.conclusion[:100]}...")
+            lines.append("\n[yellow]Conclusions reached:[/]")
+            lines.extend(
+                f"✓ {escape(point.conclusion[:100])}..."
+                for point in concluded_points if point.conclusion
+            )
+        self.console.print("\n".join(lines))
 
     # 建议添加：
     # - 异常处理机制
@@ -319,51 +492,76 @@ class DiscussionOrchestrator:
 
     async def run_discussion(self):
         """Run the discussion process"""
+        # 下一轮讨论点的预取任务：本轮回复收齐后立即开始生成，与保存进度、打印状态重叠
+        next_points_task = None
         try:
             for round_num in range(self.max_rounds):
                 self.current_round = round_num + 1
                 self.logger.log_round_start(self.current_round)
-                print(f"\n=== Round {self.current_round} ===\n")
+                logger.info(f"=== Round {self.current_round} ===")
                 
                 # 获取当前讨论点
                 if self.current_round == 1:
                     current_points = [self.initial_question]
                 else:
-                    previous_responses = self._get_previous_round_responses()
-                    current_points = await self._generate_next_round_points(previous_responses)
-                    print("\nNew discussion points for this round:")
-                    for i, point in enumerate(current_points, 1):
-                        print(f"{i}. {point.strip('1234567890. ')}")  # 移除编号
-                    print("\n")
+                    if next_points_task is None:
+                        next_points_task = asyncio.create_task(
+                            self._generate_next_round_points(self._get_previous_round_responses())
+                        )
+                    current_points = await next_points_task
+                    next_points_task = None
+                    logger.info("New discussion points for this round:\n" + "\n".join(
+                        f"{i}. {point.strip('1234567890. ')}"  # 移除编号
+                        for i, point in enumerate(current_points, 1)
+                    ))
+                
+                # 为每个 AI 分配一个讨论点（循环分配），然后并发请求
+                assignments = [
+                    (thinker, current_points[i % len(current_points)])
+                    for i, thinker in enumerate(self.thinkers)
+                ]
+                logger.info("\n".join(
+                    f"🤖 {thinker.name} discussing: {point}" for thinker, point in assignments
+                ))
+                tasks = [
+                    asyncio.create_task(self._assigned_think(thinker, point, self.current_round))
+                    for thinker, point in assignments
+                ]
                 
-                # 为每个 AI 分配一个讨论点
-                for i, thinker in enumerate(self.thinkers):
-                    point = current_points[i % len(current_points)]  # 循环分配
-                    try:
-                        print(f"🤖 {thinker.name} discussing: {point}")
-                        response = await thinker.think(point, self.current_round)
-                        
-                        if isinstance(response, dict) and "content" in response:
-                            print(f"Response: {response['content']}\n")
+                # 每个回复一到就记录并写入讨论链，不必等最慢的 thinker
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        thinker, point, response = await next_done
+                        if isinstance(response, BaseException):
+                            error_msg = f"Error occurred: {str(response)}"
+                            logger.error(error_msg)
+                            self.logger.log_error(error_msg)
+                        elif isinstance(response, dict) and "content" in response:
+                            logger.info(f"Response ({thinker.name}): {response['content']}")
                             self.discussion_chain.add_response(point, response)
                             self.logger.log_response(thinker.name, point, response["content"])
                         else:
-                            print("Error: Invalid response format\n")
-                    except Exception as e:
-                        error_msg = f"Error occurred: {str(e)}"
-                        print(error_msg)
-                        self.logger.log_error(error_msg)
+                            logger.error(f"Invalid response format from {thinker.name}")
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                
+                # 本轮回复已全部写入讨论链，记下本轮回复并提前开始生成下一轮的讨论点
+                round_responses = self._get_round_responses(self.current_round)
+                self._recent_responses.append((self.current_round, round_responses))
+                if round_num + 1 < self.max_rounds:
+                    next_points_task = asyncio.create_task(
+                        self._generate_next_round_points(round_responses)
+                    )
                 
                 # 保存本轮进度
-                self._save_round_progress(self.current_round)
+                await self._save_round_progress(self.current_round)
                 
                 # 显示本轮状态
-                print(f"\n===== Round {self.current_round} Status =====\n")
-                print("Active Points for Discussion:")
-                active_points = self.discussion_chain.get_active_points()
-                for point in active_points:
-                    print(f"• {point.content}")
-                print("\n" + "=" * 50 + "\n")
+                status_lines = [f"===== Round {self.current_round} Status =====", "Active Points for Discussion:"]
+                status_lines.extend(f"• {point.content}" for point in self._active_points())
+                status_lines.append("=" * 50)
+                logger.info("\n".join(status_lines))
                 
                 # 更新轮次开始时间
                 self.round_start_time = datetime.utcnow()
@@ -373,23 +571,34 @@ class DiscussionOrchestrator:
 
         except Exception as e:
             error_msg = f"Error occurred: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             self.logger.log_error(error_msg)
+        finally:
+            if next_points_task is not None:
+                next_points_task.cancel()
+            await self.aclose()
+
+    def _get_round_responses(self, round_num: int) -> List[str]:
+        """获取某一轮讨论点的所有回复"""
+        return [
+            response["content"]
+            for point in self.discussion_chain.get_round_points(round_num)
+            for response in point.iter_responses()
+        ]
 
     def _get_previous_round_responses(self) -> List[str]:
         """获取上一轮的所有回复"""
-        responses = []
-        for point in self.discussion_chain.points:
-            if point.round_num == self.current_round - 1:
-                for response in point.agreements + point.disagreements:
-                    responses.append(response["content"])
-        return responses
+        if self._recent_responses:
+            round_num, responses = self._recent_responses[-1]
+            if round_num == self.current_round - 1:
+                return list(responses)
+        return self._get_round_responses(self.current_round - 1)
 
     async def _generate_next_round_points(self, previous_responses: List[str]) -> List[str]:
         """根据上一轮的回复生成新的讨论点"""
         try:
             # 生成总结
-            summary = await self.context_processor.summarize_discussion(previous_responses)
+            summary = await self._summarize(previous_responses)
             
             # 基于总结生成新的讨论点
             follow_up_prompt = (
@@ -412,47 +621,74 @@ class DiscussionOrchestrator:
             self.logger.log_error(f"Error generating next round points: {str(e)}")
             return [self.initial_question]
 
-    def _save_round_progress(self, round_num: int):
+    async def _persist_round(self, round_num: int, timestamp: datetime, status: str,
+                             point_rows: List[tuple], response_rows: List[tuple], progress: dict,
+                             save_file: Path, data: dict):
+        """把一轮的快照写入 SQLite 和 round_N.json
+
+        两者互不依赖，在存储线程池中并发写入；读取方在该轮 JSON 还没导出时
+        会退回到扫描目录，所以不需要先后顺序。
+        """
+        db_result, json_result = await asyncio.gather(
+            run_storage_io(self.storage.save_round, round_num, timestamp, status, point_rows, response_rows),
+            run_storage_io(_write_json_sync, save_file, data),
+            return_exceptions=True
+        )
+        # 只有 SQLite 写入成功才记录进度，失败时下次重新写入这些增量
+        if not isinstance(db_result, BaseException):
+            self.storage.mark_saved(progress)
+        for result in (db_result, json_result):
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _save_round_progress(self, round_num: int):
         """Save the current round's progress"""
         try:
             save_dir = Path("discussions")
             save_dir.mkdir(exist_ok=True)
             
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    return super().default(obj)
-                
+            # 在事件循环线程里拍快照，序列化和写盘放到存储线程池
+            timestamp = datetime.utcnow()
+            status = "completed" if round_num < self.current_round else "ongoing"
+            
+            # 增量写入 SQLite：只包含新增的回复和状态变化的讨论点
+            point_rows, response_rows, progress = self.storage.collect_changes(self.discussion_chain.points)
+            
+            # round_N.json 仍然保留，作为 API/UI 读取的导出视图。
+            # 回复列表保持写入顺序（时间递增），不在写入端倒序：节点历史、agora 索引和
+            # context processor 的提示都按这个顺序读取，而最新优先的分页只在文件变化时
+            # 由 DiscussionService 排序一次（各列表本身有序，timsort 接近线性）
             data = {
                 "round_num": round_num,
-                "timestamp": datetime.utcnow(),
+                "timestamp": timestamp,
                 "points": [
                     {
                         "id": point.id,
                         "content": point.content,
                         "round_num": point.round_num,
                         "status": point.status,
-                        "agreements": point.agreements,
-                        "disagreements": point.disagreements,
+                        "agreements": list(point.agreements),
+                        "disagreements": list(point.disagreements),
                         "participants": list(point.participants)
                     }
                     for point in self.discussion_chain.points
                 ],
                 "responses": self._get_current_messages(),
                 "current_round": self.current_round,
-                "status": "completed" if round_num < self.current_round else "ongoing"
+                "status": status
             }
             
             save_file = save_dir / f"round_{round_num}.json"
-            with open(save_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, cls=DateTimeEncoder, ensure_ascii=False, indent=2)
+            # shield：run_discussion 被取消时写入仍然完成，SQLite 进度和 JSON 保持一致
+            await asyncio.shield(self._persist_round(
+                round_num, timestamp, status, point_rows, response_rows, progress, save_file, data
+            ))
             
-            print(f"Progress saved to {save_file}")
+            logger.info(f"Progress saved to {save_file}")
             
         except Exception as e:
             error_msg = f"Error saving progress: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             self.logger.log_error(error_msg) 
 
     def get_remaining_time(self) -> int:
@@ -471,31 +707,20 @@ class DiscussionOrchestrator:
                 round_num = self.current_round
             logger.info(f"Getting discussion points for round {round_num}, current_round is {self.current_round}")
             
-            # 检查 discussion_dir 是否存在
-            if not os.path.exists(self.discussion_dir):
-                logger.error(f"Discussion directory not found: {self.discussion_dir}")
-                return []
-            
-            # 获取目录下所有文件
-            files = os.listdir(self.discussion_dir)
-            logger.info(f"Found files in discussion dir: {files}")
-            
+            # 直接打开轮次文件，目录或文件不存在都由 FileNotFoundError 处理
             round_file = os.path.join(self.discussion_dir, f"round_{round_num}.json")
-            logger.info(f"Reading file: {round_file}")
-            
-            if not os.path.exists(round_file):
+            try:
+                with open(round_file, 'rb') as f:
+                    round_data = orjson.loads(f.read())
+            except FileNotFoundError:
                 logger.warning(f"Round file not found: {round_file}")
+                if logger.isEnabledFor(logging.DEBUG) and os.path.isdir(self.discussion_dir):
+                    logger.debug(f"Found files in discussion dir: {os.listdir(self.discussion_dir)}")
                 return []
             
-            with open(round_file, 'r', encoding='utf-8') as f:
-                round_data = json.load(f)
-                logger.info(f"Round data loaded: {round_data.keys()}")
-                logger.info(f"Number of points in round data: {len(round_data.get('points', []))}")
-            
             points = []
             for point_data in round_data.get("points", []):
                 try:
-                    logger.info(f"Processing point: {point_data['id']}")
                     point = DiscussionPoint(
                         content=point_data["content"],
                         round_num=round_num,
@@ -529,11 +754,11 @@ class DiscussionOrchestrator:
             logger.info("Creating context processor")
             key_manager = DiscussionManager.get_key_manager()
             api_key = key_manager.get_current_key()
-            context_processor = ContextProcessor(api_key=api_key)
+            context_processor = ContextProcessor(api_key=api_key, http_client=self._http)
             
             logger.info(f"Summarizing discussion for round {self.current_round}")
             # 直接传递轮次号
-            summary = await context_processor.summarize_discussion(self.current_round)
+            summary = await self._summarize(self.current_round, context_processor)
             
             logger.info("Generating next points")
             next_points = await context_processor.generate_next_points(summary)
@@ -1,14 +1,30 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from pathlib import Path
-import json
+import os
+import threading
+from itertools import chain
+from operator import itemgetter
+import heapq
 from ..utils.discussion_manager import DiscussionManager
+from ..utils.storage_pool import run_storage_io
+from ..utils.discussion_storage import DiscussionStorage
+from ..utils.file_utils import read_round_data, round_file_signature
 
 class DiscussionService:
     """服务层：管理讨论状态和进度"""
     
     def __init__(self):
         self.orchestrator = DiscussionManager.get_orchestrator()
+        # SQLite 只用来定位最新轮次。分页仍然读缓存的 JSON 解析结果：文件每轮才改写一次，
+        # 命中缓存时只需两次 stat，而 SQLite 按时间倒序分页每次都要查询（深页的 OFFSET 更慢）
+        self.storage = DiscussionStorage('discussions')
+        # 最新轮次缓存：目录 mtime 和文件 (mtime, size) 都没变时直接复用解析结果和消息；
+        # 完整排序推迟到第一次请求靠后的页时才做
+        self._cache = {'dir_mtime': None, 'path': None, 'stat': None, 'data': None,
+                       'messages': None, 'sorted_messages': None}
+        # 文件刚被改写时同时到达的请求只解析一次，其余的等待并复用结果
+        self._load_lock = threading.Lock()
         
     async def get_current_state(self, page_size: int = 20, page: int = 1) -> Dict:
         """获取当前讨论状态
@@ -18,21 +34,17 @@ class DiscussionService:
             page: Page number (1-based)
         """
         try:
-            latest_round = self._get_latest_round_file()
-            if latest_round:
-                with open(latest_round, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                all_messages = self._get_round_messages(data)
-                total_messages = len(all_messages)
-                start_idx = (page - 1) * page_size
-                end_idx = start_idx + page_size
+            start_idx = (page - 1) * page_size
+            end_idx = start_idx + page_size
+            latest = await run_storage_io(self._load_page, start_idx, end_idx)
+            if latest:
+                data, total_messages, page_messages = latest
                 
                 return {
                     'round_num': data['round_num'],
                     'status': data['status'],
                     'points': data['points'],
-                    'messages': all_messages[start_idx:end_idx],
+                    'messages': self._page_messages(page_messages),
                     'timestamp': data['timestamp'],
                     'pagination': {
                         'total': total_messages,
@@ -58,34 +70,153 @@ class DiscussionService:
             print(f"Error getting discussion state: {str(e)}")
             raise
             
+    def _load_page(self, start_idx: int, end_idx: int) -> Optional[Tuple[Dict, int, List[tuple]]]:
+        """读取最新轮次的数据、消息总数和按时间倒序的一页消息（阻塞，在存储线程池中调用）
+
+        第一页用 heapq.nlargest 只挑出前 end_idx 条，不必为了 20 条消息把整轮排序；
+        请求更靠后的页时才做一次完整排序，并缓存到文件变化为止。
+        """
+        cache = self._load_latest()
+        if cache is None:
+            return None
+        messages = cache['messages']
+        ordered = cache['sorted_messages']
+        if ordered is None and start_idx == 0 and end_idx < len(messages):
+            # 与 sorted(..., reverse=True)[:end_idx] 结果一致，时间戳相同时也保持原顺序
+            page = heapq.nlargest(end_idx, messages, key=itemgetter(0))
+        else:
+            if ordered is None:
+                ordered = self._sort_messages(messages)
+                cache['sorted_messages'] = ordered
+            page = ordered[start_idx:end_idx]
+        return cache['data'], len(messages), page
+
+    def _load_latest(self) -> Optional[Dict]:
+        """读取最新轮次，返回缓存项（阻塞，在存储线程池中调用）
+
+        新轮次文件出现时目录 mtime 会变化，因此目录和缓存文件的 stat 都没变时
+        不需要重新查找最新文件，也不需要重新解析。
+        """
+        try:
+            dir_mtime = os.stat('discussions').st_mtime_ns
+        except FileNotFoundError:
+            return None
+            
+        cache = self._fresh_cache(dir_mtime)
+        if cache is not None:
+            return cache
+        with self._load_lock:
+            # 等锁期间可能已有别的线程解析好了
+            cache = self._fresh_cache(dir_mtime)
+            if cache is not None:
+                return cache
+            return self._reload_latest(dir_mtime)
+
+    def _fresh_cache(self, dir_mtime: int) -> Optional[Dict]:
+        """目录和缓存文件的 stat 都没变时返回缓存项，否则返回 None"""
+        cache = self._cache
+        if cache['path'] is None or cache['dir_mtime'] != dir_mtime:
+            return None
+        try:
+            st = os.stat(cache['path'])
+        except FileNotFoundError:
+            return None
+        if (st.st_mtime_ns, st.st_size) != cache['stat']:
+            return None
+        return cache
+
+    def _reload_latest(self, dir_mtime: int) -> Optional[Dict]:
+        """重新查找并解析最新轮次文件，更新缓存"""
+        path = self._get_latest_round_file()
+        if path is None:
+            return None
+        data = self._load_round_file(path)
+        messages = self._get_round_messages(data)
+        # 用解析 data 时的 stat，避免文件在两次 stat 之间被重写导致缓存了旧数据
+        self._cache = cache = {
+            'dir_mtime': dir_mtime,
+            'path': path,
+            'stat': round_file_signature(int(path.stem.split('_')[1]), data),
+            'data': data,
+            'messages': messages,
+            'sorted_messages': None
+        }
+        return cache
+        
     def _get_latest_round_file(self) -> Optional[Path]:
         """获取最新的讨论文件"""
         discussion_dir = Path('discussions')
-        if not discussion_dir.exists():
-            return None
+        
+        # 优先从 SQLite 查询最新轮次；该轮的 JSON 还没导出时退回到扫描目录
+        latest = self.storage.latest_round()
+        if latest is not None:
+            path = discussion_dir / f'round_{latest}.json'
+            if path.exists():
+                return path
             
-        round_files = list(discussion_dir.glob('round_*.json'))
-        if not round_files:
+        # 单次 os.scandir：循环里只比较文件名和整数，不构造 Path，也不建中间列表
+        try:
+            entries = os.scandir(discussion_dir)
+        except FileNotFoundError:
             return None
-            
-        return max(round_files, key=lambda p: int(p.stem.split('_')[1]))
+        latest_num, latest_name = -1, None
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith('round_') and name.endswith('.json')):
+                    continue
+                try:
+                    num = int(name[6:-5])
+                except ValueError:
+                    continue
+                if num > latest_num:
+                    latest_num, latest_name = num, name
+        return discussion_dir / latest_name if latest_name else None
         
-    def _get_round_messages(self, data: Dict) -> List[Dict]:
-        """从讨论数据中提取消息，按时间戳排序"""
+    def _load_round_file(self, path: Path) -> Dict:
+        """读取讨论文件（阻塞，在存储线程池中调用）
+
+        通过 read_round_data 读取，文件的 mtime/size 不变时直接返回已解析的数据。
+        """
+        data = read_round_data(int(path.stem.split('_')[1]))
+        if data is None:
+            raise ValueError(f"Could not read discussion file {path}")
+        return data
+        
+    def _get_round_messages(self, data: Dict) -> List[tuple]:
+        """从讨论数据中提取消息（按写入顺序，未排序）
+
+        Returns lightweight (timestamp, response, round_num) tuples; dicts
+        are only built for the requested page by _page_messages. Only runs
+        when _load_latest misses its cache.
+        """
         messages = []
+        default_ts = data['timestamp']
         for point in data['points']:
-            for response in point.get('agreements', []) + point.get('disagreements', []):
-                messages.append({
-                    'model': response['author'],
-                    'content': response['content'],
-                    'timestamp': response.get('timestamp', data['timestamp']),
-                    'round_num': point['round_num']
-                })
-        
-        # Sort messages by timestamp in descending order (newest first)
-        messages.sort(key=lambda x: x['timestamp'], reverse=True)
+            round_num = point['round_num']
+            for response in chain(point.get('agreements', ()), point.get('disagreements', ())):
+                messages.append((response.get('timestamp', default_ts), response, round_num))
         return messages
 
+    def _sort_messages(self, messages: List[tuple]) -> List[tuple]:
+        """按时间戳倒序排列消息，返回新列表"""
+        # Sort messages by timestamp in descending order (newest first).
+        # 每个回复列表本身按写入时间递增，timsort 会把它们识别为有序片段，
+        # 实际代价接近按片段数归并，不需要在写入端另外维护倒序
+        return sorted(messages, key=itemgetter(0), reverse=True)
+
+    def _page_messages(self, messages: List[tuple]) -> List[Dict]:
+        """只为当前页构建消息"""
+        return [
+            {
+                'model': response['author'],
+                'content': response['content'],
+                'timestamp': timestamp,
+                'round_num': round_num
+            }
+            for timestamp, response, round_num in messages
+        ]
+
     async def get_more_messages(self, page_size: int = 20, page: int = 1) -> Dict:
         """获取更多消息用于无限滚动
         
@@ -97,8 +228,10 @@ class DiscussionService:
             Dict containing messages and pagination info
         """
         try:
-            latest_round = self._get_latest_round_file()
-            if not latest_round:
+            start_idx = (page - 1) * page_size
+            end_idx = start_idx + page_size
+            latest = await run_storage_io(self._load_page, start_idx, end_idx)
+            if not latest:
                 return {
                     'messages': [],
                     'pagination': {
@@ -109,16 +242,10 @@ class DiscussionService:
                     }
                 }
                 
-            with open(latest_round, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_messages = self._get_round_messages(data)
-            total_messages = len(all_messages)
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
+            data, total_messages, page_messages = latest
             
             return {
-                'messages': all_messages[start_idx:end_idx],
+                'messages': self._page_messages(page_messages),
                 'pagination': {
                     'total': total_messages,
                     'page': page,
@@ -1,7 +1,9 @@
 import asyncio
-import json
+from collections import deque
+from itertools import islice
 import re
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import List, Dict, TypedDict, Any, Optional
 from pydantic import BaseModel
 from openai import AsyncOpenAI
@@ -11,6 +13,23 @@ from ..utils.config import load_config
 import logging
 import aiohttp
 import httpx
+import openai
+
+# 单次请求失败（空回复）后重试前的基础等待时间
+API_RETRY_BASE_DELAY = 2
+
+def is_transient_error(exc: BaseException) -> bool:
+    """超时、网络错误、429 和 5xx 视为可重试，其余（鉴权、400 等）直接放弃"""
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError,
+                        openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    elif isinstance(exc, openai.APIStatusError):
+        status = exc.status_code
+    else:
+        return False
+    return status == 429 or status >= 500
 
 
 class Response(TypedDict):
@@ -32,10 +51,15 @@ class BaseThinker(ABC):
         model_id (str): Full model identifier (e.g., "openai/gpt-4")
         api_key (str): OpenRouter API key
         max_rounds (int): Maximum number of discussion rounds
-        conversation_history (List[Message]): History of the conversation
+        conversation_history (deque[Message]): Most recent messages of the conversation
     """
 
-    def __init__(self, model_id: str, api_key: str, config: dict):
+    # 没有注入共享客户端时，同一事件循环内的所有 thinker 共用这个兜底客户端
+    _fallback_http: Optional[httpx.AsyncClient] = None
+    _fallback_loop = None
+
+    def __init__(self, model_id: str, api_key: str, config: dict,
+                 http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the AI thinker.
         
@@ -43,40 +67,56 @@ class BaseThinker(ABC):
             model_id: Full model identifier (e.g., "openai/gpt-4")
             api_key: OpenRouter API key
             config: Configuration dictionary
+            http_client: Shared HTTP client owned by the orchestrator; when
+                omitted a class-level client is shared per event loop
         """
         self.model_id = model_id
         self.api_key = api_key
         self.config = config
+        self.http_client = http_client
+        self._openai_client = None
+        self._openai_http = None
         self._name = config.get("name", model_id)
+        # 只对特定模型发送 max_tokens，构造时判断一次，_call_api 不再每次检查模型名
+        model_id_lower = model_id.lower()
+        self._max_tokens = (
+            config.get("max_tokens", 2048)
+            if "gpt" in model_id_lower or "claude" in model_id_lower else None
+        )
         self.max_rounds = config.get("max_rounds", 10)
-        self.conversation_history = []
+        self.max_history = 5
+        # 只保留最近 max_history + 1 条：_summarize_history 只看最后一条之前的 max_history 条，
+        # 长时间讨论时历史不会无限增长；_history_len 记录总条数，用来识别第一条系统提示
+        self.conversation_history: deque = deque(maxlen=self.max_history + 1)
+        self._history_len = 0
         
         # Only create memory for regular thinkers
-        if not self._is_context_processor():
+        if not self._is_context_processor:
             from ..utils.memory_agent import MemoryAgent
             self.memory = MemoryAgent(save_path=f"memories/{self._name}")
         
-        self.max_history = 5
         self.context_summary = ""
         self.personalized_prompt = self._load_personalized_prompt()
+        # 系统提示对每个模型是固定的，所有请求共用同一个 system 消息（调用方不得修改）
+        self._system_message = {"role": "system", "content": self.personalized_prompt}
         # 初始化 logger
         self.logger = logging.getLogger(__name__)
 
+    @cached_property
     def _is_context_processor(self) -> bool:
         """Check if this thinker is the context processor"""
-        full_config = load_config()
-        return self.model_id == full_config["models"]["context_processor"]["id"]
+        return self.model_id == load_config()["models"]["context_processor"]["id"]
 
     def _load_personalized_prompt(self) -> str:
         """Load the personalized system prompt"""
-        if self._is_context_processor():
-            full_config = load_config()
-            return full_config["models"]["context_processor"]["system_prompt"]
+        if self._is_context_processor:
+            return load_config()["models"]["context_processor"]["system_prompt"]
         return self.get_personalized_prompt()
 
     def add_to_history(self, role: str, content: str):
         """Add a message to conversation history."""
-        self.conversation_history.append(Message(role=role, content=content))
+        self.conversation_history.append(Message(role=role, content=content, timestamp=datetime.utcnow()))
+        self._history_len += 1
 
     @abstractmethod
     def get_personalized_prompt(self) -> str:
@@ -85,18 +125,22 @@ class BaseThinker(ABC):
 
     def _summarize_history(self) -> str:
         """Summarize key points from historical dialogue"""
-        if len(self.conversation_history) <= 2:  # Only system prompt and one round
+        if self._history_len <= 2:  # Only system prompt and one round
             return ""
             
         # Skip system prompt, only summarize dialogue content
-        dialogue = self.conversation_history[1:]
-        summary = "Previous key points:\n"
-        for msg in dialogue[-6:-1]:  # Summarize rounds 2-6 from the end
+        # 取最后一条之前的最多 max_history 条；历史还没被截断时第一条是系统提示，不计入
+        history = self.conversation_history
+        count = min(self._history_len - 2, self.max_history)
+        end = len(history) - 1
+        lines = ["Previous key points:\n"]
+        for msg in islice(history, end - count, end):  # Summarize rounds 2-6 from the end
             if msg.role == "assistant":
                 # Extract first sentence as key point
-                first_sentence = msg.content.split('.')[0]
-                summary += f"- {first_sentence}\n"
-        return summary
+                # partition 找到第一个句号就停，不会把整段内容切成列表
+                first_sentence = msg.content.partition('.')[0]
+                lines.append(f"- {first_sentence}\n")
+        return "".join(lines)
 
     async def think(self, point: str, round_num: int = 1) -> dict:
         """Think about a discussion point and return response"""
@@ -106,12 +150,12 @@ class BaseThinker(ABC):
             
             # 构建消息
             messages = [
-                {"role": "system", "content": self.personalized_prompt},
+                self._system_message,
                 {"role": "user", "content": point_str}
             ]
             
-            # 调用 API
-            response = await self.generate_response(messages)
+            # 调用 API；think 由 orchestrator 调用，重试由它统一负责，这里只请求一次
+            response = await self.generate_response(messages, max_retries=1)
             
             # 返回标准格式的响应
             return {
@@ -122,62 +166,92 @@ class BaseThinker(ABC):
             }
             
         except Exception as e:
-            self.logger.log_error(f"Error in {self._name}: {str(e)}")
+            self.logger.error(f"Error in {self._name}: {str(e)}")
             raise
 
-    async def _call_api(self, messages: List[dict]) -> str:
-        """调用 OpenRouter API"""
-        max_retries = 3
-        base_delay = 2
+    @classmethod
+    def _get_fallback_client(cls) -> httpx.AsyncClient:
+        """按事件循环懒创建兜底客户端：连接池绑定在创建它的循环上，换了循环就重建"""
+        loop = asyncio.get_running_loop()
+        # 始终读写 BaseThinker 上的属性，所有子类共用同一个客户端
+        client = BaseThinker._fallback_http
+        if client is None or client.is_closed or BaseThinker._fallback_loop is not loop:
+            client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+            BaseThinker._fallback_http = client
+            BaseThinker._fallback_loop = loop
+        return client
+
+    @classmethod
+    async def aclose_fallback_client(cls):
+        """关闭兜底客户端，由创建 thinker 但没有注入 http_client 的调用方在退出前调用"""
+        client = BaseThinker._fallback_http
+        BaseThinker._fallback_http = None
+        BaseThinker._fallback_loop = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    def _shared_http_client(self) -> httpx.AsyncClient:
+        """注入的共享客户端优先，否则用兜底客户端"""
+        if self.http_client is not None and not self.http_client.is_closed:
+            return self.http_client
+        return self._get_fallback_client()
+
+    async def _call_api(self, messages: List[dict], max_attempts: int = 3) -> str:
+        """调用 OpenRouter API
+
+        只重试临时性错误（见 is_transient_error）和空回复；非 200 响应通过
+        raise_for_status 抛出 httpx.HTTPStatusError，调用方可以按状态码判断是否重试。
+        """
+        client = self._shared_http_client()
+        # 构建请求参数
+        payload = {
+            "model": self.model_id,
+            "messages": messages,
+            "temperature": self.config["temperature"],
+        }
         
-        for attempt in range(max_retries):
+        # 只对特定模型添加 max_tokens
+        if self._max_tokens is not None:
+            payload["max_tokens"] = self._max_tokens
+        
+        for attempt in range(max_attempts):
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    # 构建请求参数
-                    payload = {
-                        "model": self.model_id,
-                        "messages": messages,
-                        "temperature": self.config["temperature"],
-                    }
-                    
-                    # 只对特定模型添加 max_tokens
-                    if any(model in self.model_id.lower() for model in ["gpt", "claude"]):
-                        payload["max_tokens"] = self.config.get("max_tokens", 2048)
-                    
-                    response = await client.post(
-                        "https://openrouter.ai/api/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "HTTP-Referer": "https://github.com/Errance/AITHEISM",
-                            "X-Title": "AITHEISM",
-                            "Content-Type": "application/json"
-                        },
-                        json=payload
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "choices" in data and len(data["choices"]) > 0:
-                            content = data["choices"][0]["message"]["content"]
-                            if content and len(content.strip()) > 0:
-                                return content
-                    
-                    self.logger.error(f"Invalid response on attempt {attempt + 1}: {response.text}")
-                    
-                delay = base_delay * (2 ** attempt)
-                self.logger.info(f"Retrying in {delay} seconds...")
-                await asyncio.sleep(delay)
+                response = await client.post(
+                    "https://openrouter.ai/api/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "HTTP-Referer": "https://github.com/Errance/AITHEISM",
+                        "X-Title": "AITHEISM",
+                        "Content-Type": "application/json"
+                    },
+                    json=payload,
+                    timeout=30.0
+                )
+                response.raise_for_status()
+                
+                data = response.json()
+                if "choices" in data and len(data["choices"]) > 0:
+                    content = data["choices"][0]["message"]["content"]
+                    if content and len(content.strip()) > 0:
+                        return content
+                
+                self.logger.error(f"Invalid response on attempt {attempt + 1}: {response.text}")
                 
             except Exception as e:
-                self.logger.error(f"API call error on attempt {attempt + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    delay = base_delay * (2 ** attempt)
-                    self.logger.info(f"Retrying in {delay} seconds...")
-                    await asyncio.sleep(delay)
-                else:
+                if attempt == max_attempts - 1 or not is_transient_error(e):
                     raise
+                self.logger.error(f"API call error on attempt {attempt + 1}: {str(e)}")
+                
+            if attempt < max_attempts - 1:
+                delay = API_RETRY_BASE_DELAY * (2 ** attempt)
+                self.logger.info(f"Retrying in {delay} seconds...")
+                await asyncio.sleep(delay)
         
-        return "Error: No valid response after retries"
+        # 抛出而不是返回错误文本，避免它被当作总结缓存或被拆成讨论点
+        raise RuntimeError(f"No valid response from {self.model_id} after {max_attempts} attempts")
 
     def recall_memory(self):
         """Get AI's past discussion memories"""
@@ -198,7 +272,7 @@ class BaseThinker(ABC):
         if recent_discussion:
             summary_parts.append("Recent discussion:")
             for disc in recent_discussion[-2:]:
-                first_sentence = disc.split('.')[0]
+                first_sentence = disc.partition('.')[0]
                 chars = len(first_sentence)
                 if char_count + chars > 2400:  # 60% of 4000 chars limit
                     break
@@ -209,7 +283,7 @@ class BaseThinker(ABC):
         if key_arguments and char_count < 3600:  # Ensure enough space
             summary_parts.append("\nKey arguments:")
             for arg in key_arguments[-3:]:
-                first_sentence = arg.split('.')[0]
+                first_sentence = arg.partition('.')[0]
                 chars = len(first_sentence)
                 if char_count + chars > 4000:
                     break
@@ -218,15 +292,30 @@ class BaseThinker(ABC):
         
         return "\n".join(summary_parts)
 
-    async def generate_response(self, messages: List[Dict[str, str]], max_retries: int = 3) -> Optional[str]:
-        """Generate a response using the OpenRouter API."""
+    def _get_openai_client(self, config: dict) -> AsyncOpenAI:
+        """复用同一个 AsyncOpenAI 客户端，底层连接走共享的 HTTP 客户端"""
+        shared = self._shared_http_client()
+        if self._openai_client is None or self._openai_http is not shared:
+            self._openai_client = AsyncOpenAI(
+                base_url=config["base_url"],
+                api_key=self.api_key,
+                timeout=float(config["timeout"]),
+                default_headers=config["headers"],
+                http_client=shared,
+                # 重试由 generate_response / orchestrator 按错误类型控制，SDK 内部不再重试
+                max_retries=0
+            )
+            self._openai_http = shared
+        return self._openai_client
+
+    async def generate_response(self, messages: List[Dict[str, str]], max_retries: int = 3) -> str:
+        """Generate a response using the OpenRouter API.
+
+        临时性错误（429、5xx、超时、网络错误）最多尝试 max_retries 次，其余错误直接抛出
+        openai.APIStatusError 等原始异常，不再把错误文本当作回复返回。
+        """
         config = load_config()["api"]["openrouter"]
-        client = AsyncOpenAI(
-            base_url=config["base_url"],
-            api_key=self.api_key,
-            timeout=float(config["timeout"]),
-            default_headers=config["headers"]
-        )
+        client = self._get_openai_client(config)
         
         for attempt in range(max_retries):
             try:
@@ -237,25 +326,29 @@ class BaseThinker(ABC):
                     max_tokens=config["max_tokens"],
                     temperature=config["temperature"]
                 )
-                
-                if not completion or not completion.choices:
-                    if attempt < max_retries - 1:
-                        print(f"No response from {self._name}, retrying...")
-                        await asyncio.sleep(1)
-                        continue
-                    return f"Error: No response from {self._name}"
-                
-                response = completion.choices[0].message.content
-                latency = (datetime.now() - start_time).total_seconds()
-                print(f"\nAPI call successful - Model: {self._name}, Latency: {latency:.2f}s")
-                return response
-                
             except Exception as e:
+                if attempt == max_retries - 1 or not is_transient_error(e):
+                    raise
+                print(f"Error with {self._name}, retrying: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+                
+            if not completion or not completion.choices:
                 if attempt < max_retries - 1:
-                    print(f"Error with {self._name}, retrying: {str(e)}")
+                    print(f"No response from {self._name}, retrying...")
                     await asyncio.sleep(1)
                     continue
-                return f"Error in API call: {str(e)}"
+                raise RuntimeError(f"No response from {self._name}")
+            
+            response = completion.choices[0].message.content
+            latency = (datetime.now() - start_time).total_seconds()
+            print(f"\nAPI call successful - Model: {self._name}, Latency: {latency:.2f}s")
+            return response
+
+    @property
+    def provider_key(self) -> str:
+        """模型提供方，如 "openai/gpt-4o-mini" -> "openai"，用于按提供方限流"""
+        return self.model_id.split("/", 1)[0]
 
     @property
     def name(self) -> str:
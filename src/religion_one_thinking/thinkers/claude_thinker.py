@@ -4,12 +4,13 @@ from ..utils.config import load_config
 class ClaudeThinker(BaseThinker):
     """Claude implementation of the thinker."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client=None):
         model_config = load_config()["models"]["claude"]
         super().__init__(
             model_id=model_config["id"],
             api_key=api_key,
-            config=model_config
+            config=model_config,
+            http_client=http_client
         )
 
     def get_personalized_prompt(self) -> str:
@@ -3,35 +3,21 @@ from typing import List, Dict
 from .base_thinker import BaseThinker
 from ..utils.config import load_config
 from ..utils.file_utils import read_round_data
-import httpx
-import os
-import json
+from ..utils.storage_pool import run_storage_io
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
-def read_round_data(round_num: int) -> dict:
-    """Read discussion data for a specific round"""
-    try:
-        file_path = f"discussions/round_{round_num}.json"
-        if not os.path.exists(file_path):
-            return None
-            
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error reading round data: {str(e)}")
-        return None
-
 class ContextProcessor(BaseThinker):
     """Specialized thinker for processing discussion context and history."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client=None):
         model_config = load_config()["models"]["context_processor"]
         super().__init__(
             model_id=model_config["id"],
             api_key=api_key,
-            config=model_config
+            config=model_config,
+            http_client=http_client
         )
         self.temperature = model_config["temperature"]
         self.max_tokens = model_config["max_tokens"]
@@ -48,10 +34,11 @@ class ContextProcessor(BaseThinker):
             if isinstance(round_num, list):
                 logger.warning(f"Received list instead of round number, attempting to process...")
                 # 构建提示
-                prompt = "Please summarize the following discussion points:\n\n"
+                parts = ["Please summarize the following discussion points:\n\n"]
                 for response in round_num:
                     if isinstance(response, str):
-                        prompt += f"- {response}\n"
+                        parts.append(f"- {response}\n")
+                prompt = "".join(parts)
                 
                 # 使用正确的系统提示
                 system_prompt = self.get_personalized_prompt()
@@ -62,20 +49,21 @@ class ContextProcessor(BaseThinker):
                 summary = await self._call_api(messages)
                 return summary
                 
-            # 正常的轮次号处理
-            round_data = read_round_data(round_num)
+            # 正常的轮次号处理；文件被改写后需要重新解析，放到存储线程池里不阻塞事件循环
+            round_data = await run_storage_io(read_round_data, round_num)
             if not round_data:
                 raise ValueError(f"No data found for round {round_num}")
                 
-            # 构建提示
-            prompt = f"Please summarize the following discussion points and responses:\n\n"
+            # 构建提示：先收集片段再一次 join，避免大轮次里反复复制整段字符串
+            parts = ["Please summarize the following discussion points and responses:\n\n"]
             for point in round_data.get("points", []):
-                prompt += f"Point: {point['content']}\n"
-                for response in point.get("agreements", []):
-                    prompt += f"{response['author']} agrees: {response['content']}\n"
-                for response in point.get("disagreements", []):
-                    prompt += f"{response['author']} disagrees: {response['content']}\n"
-                prompt += "\n"
+                parts.append(f"Point: {point['content']}\n")
+                for response in point.get("agreements", ()):
+                    parts.append(f"{response['author']} agrees: {response['content']}\n")
+                for response in point.get("disagreements", ()):
+                    parts.append(f"{response['author']} disagrees: {response['content']}\n")
+                parts.append("\n")
+            prompt = "".join(parts)
                 
             # 调用 API 获取总结
             messages = [
@@ -92,8 +80,10 @@ class ContextProcessor(BaseThinker):
     async def generate_next_points(self, summary: str) -> List[str]:
         """Generate discussion points for the next round based on the summary"""
         try:
-            prompt = f"Based on this summary of the previous discussion:\n{summary}\n\n"
-            prompt += "Please generate 3-5 new discussion points that would deepen or expand the conversation."
+            prompt = (
+                f"Based on this summary of the previous discussion:\n{summary}\n\n"
+                "Please generate 3-5 new discussion points that would deepen or expand the conversation."
+            )
             
             messages = [
                 {"role": "system", "content": self.get_personalized_prompt()},
@@ -112,12 +102,13 @@ class ContextProcessor(BaseThinker):
 
     async def analyze_patterns(self, discussion_history: list) -> str:
         """Analyze patterns and themes in discussion history."""
-        prompt = (
+        parts = [
             "Please analyze the following discussion history to identify key patterns, "
             "emerging themes, and potential areas for deeper exploration:\n\n"
-        )
+        ]
         for entry in discussion_history:
-            prompt += f"- {entry}\n"
+            parts.append(f"- {entry}\n")
+        prompt = "".join(parts)
             
         messages = [
             {"role": "system", "content": self.get_personalized_prompt()},
@@ -145,23 +136,6 @@ class ContextProcessor(BaseThinker):
             print(f"Error generating discussion points: {str(e)}")
             return None
             
-    async def _call_api(self, messages: List[dict]) -> str:
-        """调用 OpenRouter API"""
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": "gpt-4",
-            "messages": messages
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data)
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"] 
-
     def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
         """构建 API 消息格式"""
         return [
@@ -7,12 +7,13 @@ import logging
 class DeepSeekThinker(BaseThinker):
     """DeepSeek implementation of the thinker."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client=None):
         model_config = load_config()["models"]["deepseek"]
         super().__init__(
             model_id=model_config["id"],
             api_key=api_key,
-            config=model_config
+            config=model_config,
+            http_client=http_client
         )
         self.max_tokens = 2048
         self.temperature = model_config["temperature"]
@@ -39,28 +40,19 @@ Focus on:
 
 Keep your responses focused and clear. If you reach a conclusion, explicitly state it."""
 
-    async def generate_response(self, messages: List[dict]) -> str:
-        """Generate response with retries and error handling"""
-        max_retries = 3
+    async def generate_response(self, messages: List[dict], max_retries: int = 3) -> str:
+        """Generate response with retries and error handling
+
+        回复太短时重新请求；请求失败时抛出原始异常（由 _call_api 只重试临时性错误），
+        不再把错误文本当作回复返回。
+        """
+        response = None
         for attempt in range(max_retries):
-            try:
-                response = await asyncio.wait_for(
-                    self._call_api(messages),
-                    timeout=45  # 增加超时时间到45秒
-                )
-                if response and len(response) > 100:
-                    return response
-                self.logger.warning(f"Response too short, retrying... (attempt {attempt + 1})")
-            except asyncio.TimeoutError:
-                self.logger.error(f"Timeout on attempt {attempt + 1}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 * (attempt + 1))  # 指数退避
-                    continue
-                return "Error: API request timed out"
-            except Exception as e:
-                self.logger.error(f"Error on attempt {attempt + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 * (attempt + 1))
-                    continue
-                return f"Error: {str(e)}"
-        return "Error: Could not generate complete response" 
\ No newline at end of file
+            response = await asyncio.wait_for(
+                self._call_api(messages, max_attempts=max_retries),
+                timeout=45  # 增加超时时间到45秒
+            )
+            if len(response) > 100:
+                return response
+            self.logger.warning(f"Response too short, retrying... (attempt {attempt + 1})")
+        return response
@@ -1,7 +1,6 @@
 from .base_thinker import BaseThinker
 from ..utils.config import load_config
 from typing import Dict
-import asyncio
 from datetime import datetime
 import logging
 
@@ -10,12 +9,13 @@ logger = logging.getLogger(__name__)
 class GeminiThinker(BaseThinker):
     """Gemini implementation of the thinker."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client=None):
         model_config = load_config()["models"]["gemini"]
         super().__init__(
             model_id=model_config["id"],
             api_key=api_key,
-            config=model_config
+            config=model_config,
+            http_client=http_client
         )
 
     def get_personalized_prompt(self) -> str:
@@ -39,31 +39,18 @@ Focus on:
 Keep your responses focused and clear. If you reach a conclusion, explicitly state it.""" 
 
     async def think(self, content: str, round_num: int) -> Dict[str, str]:
+        # 重试由 orchestrator 按错误类型统一处理，这里只请求一次，失败时抛出原始异常
+        messages = [
+            self._system_message,
+            {"role": "user", "content": content}
+        ]
         try:
-            # 添加重试逻辑
-            for attempt in range(self.config.get("retry_attempts", 3)):
-                try:
-                    # 构建消息格式
-                    messages = [
-                        {"role": "system", "content": self.get_personalized_prompt()},
-                        {"role": "user", "content": content}
-                    ]
-                    
-                    response = await self._call_api(messages)
-                    return {
-                        "author": self._name,
-                        "content": response,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                except Exception as e:
-                    if attempt < self.config.get("retry_attempts", 3) - 1:
-                        await asyncio.sleep(self.config.get("retry_delay", 1) * (attempt + 1))
-                        continue
-                    raise
+            response = await self._call_api(messages, max_attempts=1)
         except Exception as e:
             logger.error(f"Error in {self._name}: {str(e)}")
-            return {
-                "author": self._name,
-                "content": f"Error: {str(e)}",
-                "timestamp": datetime.utcnow().isoformat()
-            } 
\ No newline at end of file
+            raise
+        return {
+            "author": self._name,
+            "content": response,
+            "timestamp": datetime.utcnow().isoformat()
+        }
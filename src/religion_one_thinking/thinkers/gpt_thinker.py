@@ -1,27 +1,51 @@
 from .base_thinker import BaseThinker
 from ..utils.config import load_config
-import json
-from typing import List
+import orjson
+from typing import List, Optional
 import os
+import re
+
+# 新记忆先追加到 JSONL 日志，累计到一定条数再合并进 memories.json 快照。
+# 文件名不能与 MemoryAgent 的 memories.jsonl 相同：大小写不敏感的文件系统上
+# memories/gpt 和 memories/GPT 是同一个目录
+MEMORY_LOG_FILENAME = "gpt_memories.jsonl"
+MEMORY_COMPACT_EVERY = 200
+
+# 回复末尾 "MEMORIES:" 之后的记忆列表
+_MEMORIES_RE = re.compile(r"MEMORIES:\s*(.*)", re.DOTALL)
 
 class GPTThinker(BaseThinker):
     """GPT implementation of the thinker."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client=None):
         model_config = load_config()["models"]["gpt"]
         super().__init__(
             model_id=model_config["id"],
             api_key=api_key,
-            config=model_config
+            config=model_config,
+            http_client=http_client
         )
         
         # 确保记忆目录存在
         memory_dir = "memories/gpt"
         os.makedirs(memory_dir, exist_ok=True)
         self.memory_file = os.path.join(memory_dir, "memories.json")
+        self.memory_log_file = os.path.join(memory_dir, MEMORY_LOG_FILENAME)
+        # 追加写入的日志句柄，第一次有新记忆时打开，之后一直复用
+        self.memory_log = None
         
-        # 加载已有记忆
-        self.memories = self._load_memories()
+        # 已有记忆在第一次访问 memories 时才加载：平时只追加日志，
+        # 只有合并快照时才需要完整列表，启动时不用解析整个记忆文件
+        self._memories: Optional[List[str]] = None
+        # 还没合并进快照的记忆条数
+        self._unsnapshotted = 0
+
+    @property
+    def memories(self) -> List[str]:
+        """全部记忆（快照加日志），第一次访问时加载"""
+        if self._memories is None:
+            self._memories = self._load_memories()
+        return self._memories
 
     def get_personalized_prompt(self) -> str:
         """Returns GPT's personalized system prompt."""
@@ -41,25 +65,65 @@ class GPTThinker(BaseThinker):
         - [Memory 2]
         """
 
-    async def generate_response(self, messages: List[dict]) -> str:
-        response = await super().generate_response(messages)
+    async def generate_response(self, messages: List[dict], max_retries: int = 3) -> str:
+        response = await super().generate_response(messages, max_retries=max_retries)
         
         # 提取记忆
-        if "MEMORIES:" in response:
-            memories_section = response.split("MEMORIES:")[1].strip()
-            new_memories = [m.strip("- ").strip() for m in memories_section.split("\n") if m.strip()]
-            self.memories.extend(new_memories)
+        match = _MEMORIES_RE.search(response) if response else None
+        if match:
+            new_memories = [line.strip("- ").strip() for line in match.group(1).splitlines() if line.strip()]
+            # 还没加载时不用补上，之后加载会从日志里读到这些记忆
+            if self._memories is not None:
+                self._memories.extend(new_memories)
+            self._append_memories(new_memories)
             
         return response 
 
+    def _append_memories(self, new_memories: List[str]):
+        """把本次的新记忆一次性追加到日志，只写新增部分"""
+        if not new_memories:
+            return
+        if self.memory_log is None:
+            self.memory_log = open(self.memory_log_file, "ab")
+        self.memory_log.write(b"".join(
+            orjson.dumps(m, option=orjson.OPT_APPEND_NEWLINE) for m in new_memories
+        ))
+        self.memory_log.flush()
+        self._unsnapshotted += len(new_memories)
+        if self._unsnapshotted >= MEMORY_COMPACT_EVERY:
+            self._save_memories()
+
     def _load_memories(self) -> List[str]:
-        """Load existing memories from file"""
-        if os.path.exists(self.memory_file):
-            with open(self.memory_file, "r") as f:
-                return json.load(f)
-        return []
+        """Load existing memories from file: 快照加上之后追加的日志"""
+        try:
+            with open(self.memory_file, "rb") as f:
+                memories = orjson.loads(f.read())
+        except FileNotFoundError:
+            memories = []
+        try:
+            with open(self.memory_log_file, "rb") as f:
+                memories.extend(orjson.loads(line) for line in f if line.strip())
+        except FileNotFoundError:
+            pass
+        return memories
 
     def _save_memories(self):
-        """Save memories to file"""
-        with open(self.memory_file, "w") as f:
-            json.dump(self.memories, f, indent=2) 
\ No newline at end of file
+        """Save memories to file: 写完整快照后清空日志"""
+        tmp_file = self.memory_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(orjson.dumps(self.memories, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, self.memory_file)
+        # 快照已包含全部记忆，用空文件原子替换日志，日志从头开始
+        if self.memory_log is not None:
+            self.memory_log.close()
+        tmp_log = self.memory_log_file + ".tmp"
+        open(tmp_log, "wb").close()
+        os.replace(tmp_log, self.memory_log_file)
+        self.memory_log = open(self.memory_log_file, "ab")
+        self._unsnapshotted = 0
+
+    def close(self):
+        """关闭记忆日志句柄"""
+        if self.memory_log is not None:
+            self.memory_log.close()
+            self.memory_log = None
\ No newline at end of file
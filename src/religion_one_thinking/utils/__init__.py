@@ -1,5 +1,21 @@
-from .memory_agent import MemoryAgent
-from .message import Message
-from .logger import DiscussionLogger
+from importlib import import_module
 
-__all__ = ['MemoryAgent', 'Message', 'DiscussionLogger'] 
\ No newline at end of file
+# 按需导入：只用到 file_utils 等子模块时不必加载 pydantic、记忆和日志模块（PEP 562）
+_LAZY_EXPORTS = {
+    'MemoryAgent': '.memory_agent',
+    'Message': '.message',
+    'DiscussionLogger': '.logger',
+}
+
+__all__ = ['MemoryAgent', 'Message', 'DiscussionLogger']
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
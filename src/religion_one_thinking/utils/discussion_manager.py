@@ -1,39 +1,51 @@
-import asyncio
+import logging
+import threading
 from ..utils.key_manager import KeyManager
 
+logger = logging.getLogger(__name__)
+
 class DiscussionManager:
     _orchestrator = None
     _key_manager = None
-    
+    # 双重检查加锁，并发首次访问时也只创建一个实例；两个锁分开，
+    # 创建 orchestrator 的过程中获取 key manager 不会死锁
+    _orchestrator_lock = threading.Lock()
+    _key_manager_lock = threading.Lock()
+
     @classmethod
     def get_orchestrator(cls):
         """获取 orchestrator 实例"""
-        if cls._orchestrator is None:
-            from ..discussion.orchestrator import DiscussionOrchestrator
-            cls._orchestrator = DiscussionOrchestrator()
-            print(f"Created new orchestrator instance: {id(cls._orchestrator)}")
-        else:
-            print(f"Using existing orchestrator instance: {id(cls._orchestrator)}")
-            
-        # 检查 orchestrator 的状态
-        if hasattr(cls._orchestrator, 'discussion_chain'):
-            print(f"Discussion chain exists: {id(cls._orchestrator.discussion_chain)}")
-            if cls._orchestrator.discussion_chain:
-                print(f"Number of points: {len(cls._orchestrator.discussion_chain.points)}")
-                print(f"Current round: {cls._orchestrator.current_round}")
-        else:
-            print("Warning: orchestrator has no discussion_chain")
-            
-        return cls._orchestrator
-        
+        orchestrator = cls._orchestrator
+        if orchestrator is None:
+            with cls._orchestrator_lock:
+                orchestrator = cls._orchestrator
+                if orchestrator is None:
+                    from ..discussion.orchestrator import DiscussionOrchestrator
+                    orchestrator = cls._orchestrator = DiscussionOrchestrator()
+                    logger.debug(f"Created new orchestrator instance: {id(orchestrator)}")
+
+        # 检查 orchestrator 的状态，只在开启 debug 日志时输出
+        if logger.isEnabledFor(logging.DEBUG):
+            chain = getattr(orchestrator, 'discussion_chain', None)
+            logger.debug(f"Using orchestrator instance: {id(orchestrator)}, discussion chain: {id(chain)}")
+            if chain:
+                logger.debug(f"Number of points: {len(chain.points)}, current round: {orchestrator.current_round}")
+
+        return orchestrator
+
     @classmethod
     def reset(cls):
         """重置 orchestrator 实例（用于测试）"""
-        cls._orchestrator = None
-        print("Orchestrator instance reset")
+        with cls._orchestrator_lock:
+            cls._orchestrator = None
+        logger.debug("Orchestrator instance reset")
 
     @classmethod
     def get_key_manager(cls):
-        if cls._key_manager is None:
-            cls._key_manager = KeyManager()
-        return cls._key_manager
\ No newline at end of file
+        key_manager = cls._key_manager
+        if key_manager is None:
+            with cls._key_manager_lock:
+                key_manager = cls._key_manager
+                if key_manager is None:
+                    key_manager = cls._key_manager = KeyManager()
+        return key_manager
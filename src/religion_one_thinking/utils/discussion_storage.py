@@ -1,10 +1,133 @@
-from typing import Dict
-import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+# 讨论记录的 SQLite 存储（只追加），与 round_N.json 放在同一目录
+DB_FILENAME = "discussions.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    round_num INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS points (
+    id TEXT PRIMARY KEY,
+    round_num INTEGER,
+    content TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    point_id TEXT REFERENCES points(id),
+    author TEXT,
+    content TEXT,
+    agreement INTEGER,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS responses_point_id ON responses(point_id);
+"""
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
 class DiscussionStorage:
-    def save_round(self, round_num: int, discussion_data: Dict):
-        """保存完整的讨论记录到文件"""
-        filename = f"discussions/round_{round_num}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w') as f:
-            json.dump(discussion_data, f, indent=2) 
\ No newline at end of file
+    """讨论记录的只追加存储
+
+    每轮只写入新增的回复和状态有变化的讨论点，而不是重写全部历史。
+    已写入的进度记录在内存中：collect_changes 在事件循环线程调用，
+    save_round 是阻塞的，在存储线程池中调用，写入成功后再 mark_saved。
+
+    写连接第一次保存时打开并一直保持：每次关闭最后一个连接都会删除 -wal/-shm，
+    下一次打开又重新创建，讨论目录的 mtime 随之变化，API 端的缓存就会多失效一次。
+    """
+
+    def __init__(self, save_dir: str = "discussions"):
+        self.db_path = Path(save_dir) / DB_FILENAME
+        # point_id -> (已写入的赞同数, 已写入的反对数, 已写入的状态)
+        self._saved: Dict[str, Tuple[int, int, str]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        # save_round 可能在存储线程池的不同线程中调用，串行使用同一个写连接
+        self._conn_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取写连接，第一次调用时打开（调用方需持有 _conn_lock）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL 模式下 API 进程读取时不会阻塞讨论进程写入
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """关闭写连接"""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def collect_changes(self, points: Iterable) -> Tuple[List[tuple], List[tuple], dict]:
+        """找出自上次保存以来新增或状态变化的讨论点、新增的回复，以及新的写入进度"""
+        point_rows = []
+        response_rows = []
+        progress = {}
+        for point in points:
+            n_agree, n_disagree, status = self._saved.get(point.id, (0, 0, None))
+            if status != point.status:
+                point_rows.append((point.id, point.round_num, point.content, point.status))
+            for agreement, responses, start in ((1, point.agreements, n_agree),
+                                                (0, point.disagreements, n_disagree)):
+                for response in responses[start:]:
+                    response_rows.append((
+                        point.id,
+                        response.get("author"),
+                        response.get("content"),
+                        agreement,
+                        _isoformat(response.get("timestamp"))
+                    ))
+            progress[point.id] = (len(point.agreements), len(point.disagreements), point.status)
+        return point_rows, response_rows, progress
+
+    def mark_saved(self, progress: dict):
+        """save_round 成功后记录写入进度，失败时下次会重新写入这些增量"""
+        self._saved.update(progress)
+
+    def save_round(self, round_num: int, timestamp: datetime, status: str,
+                   point_rows: List[tuple], response_rows: List[tuple]):
+        """在一个事务中写入本轮的增量（阻塞）"""
+        with self._conn_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rounds (round_num, timestamp, status) VALUES (?, ?, ?)",
+                    (round_num, _isoformat(timestamp), status)
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO points (id, round_num, content, status) VALUES (?, ?, ?, ?)",
+                    point_rows
+                )
+                conn.executemany(
+                    "INSERT INTO responses (point_id, author, content, agreement, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    response_rows
+                )
+
+    def latest_round(self) -> Optional[int]:
+        """最新的轮次号，数据库不存在时返回 None（阻塞）"""
+        # 直接以只读方式打开，数据库不存在时 connect 会失败，不用先 stat 一次
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        except sqlite3.OperationalError:
+            return None
+        try:
+            row = conn.execute("SELECT MAX(round_num) FROM rounds").fetchone()
+        except sqlite3.OperationalError:
+            # 写入方刚创建文件还没建表，或数据库被锁：交给调用方扫描目录
+            return None
+        finally:
+            conn.close()
+        return row[0] if row else None
@@ -1,18 +1,151 @@
 import os
-import json
+import mmap
 import logging
+import threading
+from collections import OrderedDict, deque
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-def read_round_data(round_num: int) -> dict:
-    """Read discussion data for a specific round"""
+# 已解析的轮次数据缓存（LRU）: round_num -> (st_mtime_ns, st_size, data)。
+# 轮次文件是累积的，第 N 轮包含之前所有讨论点，文件大小随 N 线性增长；
+# 缓存全部轮次会占用 O(轮次²) 内存，所以只保留最近用到的几轮
+ROUND_CACHE_SIZE = 8
+_ROUND_CACHE: "OrderedDict[int, Tuple[int, int, dict]]" = OrderedDict()
+# 存储线程池和预读线程会并发读写缓存
+_cache_lock = threading.Lock()
+
+# 超过该大小的轮次文件通过 mmap 解析，避免额外复制一份文件内容
+MMAP_THRESHOLD = 1 << 20
+
+# 批量读取轮次文件用的线程池；与存储线程池分开，
+# 在存储线程里调用 iter_round_files 时不会等待同一个池而死锁
+PREFETCH_POOL_SIZE = 4
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+
+def _round_path(round_num: int) -> str:
+    return f"discussions/round_{round_num}.json"
+
+def round_file_stat(round_num: int) -> Optional[Tuple[int, int]]:
+    """轮次文件当前的 (st_mtime_ns, st_size)，文件不存在时返回 None（只 stat，不解析）"""
+    try:
+        st = os.stat(_round_path(round_num))
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def read_round_file(round_num: int) -> Tuple[Optional[dict], Optional[Tuple[int, int]]]:
+    """读取轮次数据及其对应的文件签名 (st_mtime_ns, st_size)
+
+    文件不存在或无法解析时返回 (None, None)。
+    """
+    file_path = _round_path(round_num)
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        with _cache_lock:
+            _ROUND_CACHE.pop(round_num, None)
+        return None, None
+
+    with _cache_lock:
+        cached = _ROUND_CACHE.get(round_num)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _ROUND_CACHE.move_to_end(round_num)
+            return cached[2], (cached[0], cached[1])
+
     try:
-        file_path = f"discussions/round_{round_num}.json"
-        if not os.path.exists(file_path):
-            return None
-            
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
+        with open(file_path, 'rb') as f:
+            # 用打开后的 fstat 作为缓存签名：文件在 stat 和 open 之间被替换时，
+            # 签名仍然对应实际读到的内容
+            st = os.fstat(f.fileno())
+            if st.st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        data = orjson.loads(view)
+            else:
+                data = orjson.loads(f.read())
+    except FileNotFoundError:
+        with _cache_lock:
+            _ROUND_CACHE.pop(round_num, None)
+        return None, None
+    except (OSError, ValueError) as e:
+        # orjson.JSONDecodeError 是 ValueError 的子类；写到一半或损坏的文件按不存在处理
         logger.error(f"Error reading round data: {str(e)}")
-        return None 
\ No newline at end of file
+        return None, None
+
+    signature = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        _ROUND_CACHE[round_num] = (signature[0], signature[1], data)
+        _ROUND_CACHE.move_to_end(round_num)
+        while len(_ROUND_CACHE) > ROUND_CACHE_SIZE:
+            _ROUND_CACHE.popitem(last=False)
+    return data, signature
+
+def read_round_data(round_num: int) -> dict:
+    """Read discussion data for a specific round
+
+    Recently used rounds are cached keyed by the file's mtime and size, so a
+    round file is only re-parsed after it has been rewritten (or evicted).
+    The returned dict is shared between callers and must not be mutated.
+    """
+    return read_round_file(round_num)[0]
+
+def round_file_signature(round_num: int, data: dict) -> Optional[Tuple[int, int]]:
+    """返回 data 对应的轮次文件 (st_mtime_ns, st_size)，data 已过期时返回 None"""
+    with _cache_lock:
+        cached = _ROUND_CACHE.get(round_num)
+    if cached and cached[2] is data:
+        return cached[0], cached[1]
+    return None
+
+def existing_round_numbers() -> List[int]:
+    """discussions 目录下已有的轮次号，按升序返回（阻塞）"""
+    rounds = []
+    try:
+        with os.scandir("discussions") as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("round_") and name.endswith(".json"):
+                    try:
+                        rounds.append(int(name[6:-5]))
+                    except ValueError:
+                        continue
+    except FileNotFoundError:
+        return []
+    rounds.sort()
+    return rounds
+
+_END = object()
+
+def iter_round_files(round_nums: Iterable[int]) -> Iterator[Tuple[int, Optional[dict], Optional[Tuple[int, int]]]]:
+    """按顺序返回 (round_num, data, signature)，后台并行读取后面几轮（阻塞）
+
+    读文件时会释放 GIL，几十个轮次并行读取比逐个读取快一倍左右。
+    同时在读的轮次不超过 2 * PREFETCH_POOL_SIZE，不会一次把所有轮次都解析进内存。
+    """
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        _prefetch_executor = ThreadPoolExecutor(
+            max_workers=PREFETCH_POOL_SIZE,
+            thread_name_prefix="round-prefetch"
+        )
+    pending = deque()
+    round_iter = iter(round_nums)
+    window = 2 * PREFETCH_POOL_SIZE
+    try:
+        for round_num in round_iter:
+            pending.append((round_num, _prefetch_executor.submit(read_round_file, round_num)))
+            if len(pending) >= window:
+                break
+        while pending:
+            round_num, future = pending.popleft()
+            next_round = next(round_iter, _END)
+            if next_round is not _END:
+                pending.append((next_round, _prefetch_executor.submit(read_round_file, next_round)))
+            data, signature = future.result()
+            yield round_num, data, signature
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -6,6 +6,12 @@ import logging
 logger = logging.getLogger(__name__)
 
 class KeyManager:
+    """OpenRouter API key 管理
+
+    key 只从环境变量 / .env 本地读取，格式校验见 env_validator，
+    这里不会发起任何远程校验请求，所以没有需要并发化的网络 I/O。
+    """
+
     def __init__(self):
         self.keys = []
         self.current_index = 0
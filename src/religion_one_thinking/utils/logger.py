@@ -1,23 +1,73 @@
 from datetime import datetime
+import atexit
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
 from typing import Optional
 
+# 讨论日志使用的 logger 名称
+LOGGER_NAME = "AI_Religion_Discussion"
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 后台写日志的监听线程和它写入的文件，整个进程只启动一个
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_file: Optional[Path] = None
+
+def _stop_listener():
+    """进程退出时把队列里剩余的日志写完，并摘掉入队的 handler"""
+    global _listener, _log_file
+    if _listener is None:
+        return
+    discussion_logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(discussion_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            discussion_logger.removeHandler(handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _log_file = None
+
+def _setup_queue_logging(log_file: Path) -> Path:
+    """讨论 logger 只做入队，真正的文件和控制台写入在 QueueListener 线程里完成
+
+    处理器直接挂在讨论 logger 上，而不是根 logger：orchestrator 和 API 在导入时
+    已经调用过 logging.basicConfig，根 logger 总是有 handler。讨论 logger 不再向根
+    logger 传播，否则每条日志仍会在事件循环里同步写一次 stderr；控制台输出改由
+    监听线程里的 StreamHandler 负责。返回实际写入的日志文件。
+    """
+    global _listener, _log_file
+    if _listener is not None:
+        return _log_file
+    formatter = logging.Formatter(_LOG_FORMAT)
+    file_handler = logging.FileHandler(str(log_file))
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    discussion_logger = logging.getLogger(LOGGER_NAME)
+    discussion_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    discussion_logger.setLevel(logging.INFO)
+    discussion_logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    _log_file = log_file
+    atexit.register(_stop_listener)
+    return log_file
+
 class DiscussionLogger:
     """Logger for AI Religion Discussion"""
     
     def __init__(self):
         self.log_dir = Path("logs")
         self.log_dir.mkdir(exist_ok=True)
-        self.log_file = self.log_dir / f"discussion_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.log"
+        log_file = self.log_dir / f"discussion_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.log"
         
-        # 设置日志格式
-        logging.basicConfig(
-            filename=str(self.log_file),
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        self.logger = logging.getLogger("AI_Religion_Discussion")
+        # 设置日志格式，写文件放到后台线程，避免阻塞事件循环；进程内只有第一个实例创建日志文件
+        self.log_file = _setup_queue_logging(log_file)
+        self.logger = logging.getLogger(LOGGER_NAME)
         
     def log_round_start(self, round_num: int):
         """记录轮次开始"""
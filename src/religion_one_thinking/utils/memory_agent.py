@@ -1,8 +1,12 @@
+from collections import defaultdict, deque
+from itertools import islice
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import json
+import orjson
 from pathlib import Path
-import tiktoken
+
+# 所有记忆追加到同一个 JSONL 文件，每行一条
+MEMORY_FILENAME = "memories.jsonl"
 
 class MemoryAgent:
     """Manages conversation memory and context retrieval"""
@@ -14,10 +18,16 @@ class MemoryAgent:
         Args:
             save_path: Path to save memory files. Defaults to "memories"
         """
-        self.memories = []  # Store conversation records
+        self.max_memories = 100
+        # Store conversation records; deque 超过上限时自动丢弃最旧的记录
+        self.memories: deque = deque(maxlen=self.max_memories)
+        # 按类型索引的 (content, 第一句) 列表，与 memories 同步增删，
+        # 按类型查询时不用扫描全部记忆，也不用每次重新切第一句
+        self._by_type: Dict[str, deque] = defaultdict(deque)
         self.save_path = Path(save_path or "memories")
         self.save_path.mkdir(parents=True, exist_ok=True)
-        self.max_memories = 100
+        # 追加写入的文件句柄，第一次保存记忆时打开，之后一直复用
+        self._file = None
         
     def add_memory(self, content: str, author: str, round_num: int, 
                   memory_type: str = "discussion"):
@@ -37,12 +47,12 @@ class MemoryAgent:
             "type": memory_type,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if len(self.memories) == self.max_memories:
+            # 最旧的一条即将被挤出，它也是所属类型里最旧的一条
+            evicted = self.memories[0]
+            self._by_type[evicted["type"]].popleft()
         self.memories.append(memory)
-        
-        # Maintain memory limit
-        if len(self.memories) > self.max_memories:
-            self.memories = self.memories[-self.max_memories:]
-            
+        self._by_type[memory_type].append((content, content.partition('.')[0]))
         self._save_memory(memory)
         
     def get_round_discussion(self, round_num: int) -> List[Dict[str, str]]:
@@ -50,26 +60,41 @@ class MemoryAgent:
         return [m for m in self.memories if m["round"] == round_num]
         
     def _save_memory(self, memory: Dict[str, Any]):
-        """Save memory to file"""
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        save_file = self.save_path / f"memory_{timestamp}.json"
-        with open(save_file, "w", encoding="utf-8") as f:
-            json.dump(memory, f, ensure_ascii=False, indent=2)
+        """Append memory to the JSONL file"""
+        if self._file is None:
+            self._file = open(self.save_path / MEMORY_FILENAME, "ab")
+        # 一次 write 追加一行，不再为每条记忆新建文件
+        self._file.write(orjson.dumps(memory, option=orjson.OPT_APPEND_NEWLINE))
+        self._file.flush()
+
+    def close(self):
+        """关闭记忆文件句柄"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _recent_of_type(self, memory_type: str, limit: int) -> List[tuple]:
+        """某类型最近 limit 条 (content, 第一句)，按时间正序；limit <= 0 时返回全部"""
+        entries = self._by_type.get(memory_type, ())
+        if limit <= 0:
+            return list(entries)
+        recent = list(islice(reversed(entries), limit))
+        recent.reverse()
+        return recent
 
     def get_recent_discussion(self, limit: int = 5) -> List[str]:
         """Get recent discussion records"""
-        recent_memories = [
-            m["content"] for m in self.memories 
-            if m["type"] == "discussion"
-        ]
-        return recent_memories[-limit:]
+        return [content for content, _ in self._recent_of_type("discussion", limit)]
 
     def get_memory_by_type(self, memory_type: str) -> List[str]:
         """Get memories of specified type"""
-        return [
-            m["content"] for m in self.memories 
-            if m["type"] == memory_type
-        ]
+        return [content for content, _ in self._by_type.get(memory_type, ())]
 
     def get_context_summary(self, max_chars: int = 2000) -> str:
         """
@@ -81,8 +106,9 @@ class MemoryAgent:
         Returns:
             Formatted context summary
         """
-        recent_discussion = self.get_recent_discussion()
-        key_arguments = self.get_memory_by_type("key_arguments")
+        # 与 get_recent_discussion()[-2:] 和 get_memory_by_type(...)[-3:] 相同，直接取索引里的第一句
+        recent_discussion = self._recent_of_type("discussion", 2)
+        key_arguments = self._recent_of_type("key_arguments", 3)
         
         char_count = 0
         summary_parts = []
@@ -90,8 +116,7 @@ class MemoryAgent:
         # Add recent discussion
         if recent_discussion:
             summary_parts.append("Recent discussion:")
-            for disc in recent_discussion[-2:]:  # Last 2 discussions
-                first_sentence = disc.split('.')[0]
+            for _, first_sentence in recent_discussion:  # Last 2 discussions
                 chars = len(first_sentence)
                 if char_count + chars > max_chars * 0.6:  # Use 60% for discussion
                     break
@@ -101,8 +126,7 @@ class MemoryAgent:
         # Add key arguments
         if key_arguments and char_count < max_chars * 0.9:  # Leave 10% buffer
             summary_parts.append("\nKey arguments:")
-            for arg in key_arguments[-3:]:  # Last 3 key arguments
-                first_sentence = arg.split('.')[0]
+            for _, first_sentence in key_arguments:  # Last 3 key arguments
                 chars = len(first_sentence)
                 if char_count + chars > max_chars:
                     break
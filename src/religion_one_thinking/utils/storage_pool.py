@@ -0,0 +1,37 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 讨论文件读写共用的线程池大小
+STORAGE_POOL_SIZE = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """获取存储 I/O 线程池，首次调用时创建"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=STORAGE_POOL_SIZE,
+            thread_name_prefix="storage"
+        )
+        logger.info(f"Created storage pool with {STORAGE_POOL_SIZE} workers")
+    return _executor
+
+async def run_storage_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """在存储线程池中执行阻塞的文件操作，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_storage_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+def shutdown_storage_pool():
+    """关闭存储线程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,100 @@
+import os
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _round(round_num: int, n_points: int) -> dict:
+    points = []
+    for p in range(1, n_points + 1):
+        agreements = [
+            {"author": f"A{i}", "content": f"I agree r{round_num}p{p}i{i}",
+             "timestamp": f"2024-01-0{round_num}T00:0{p}:{i:02d}"}
+            for i in range(3)
+        ]
+        disagreements = [
+            {"author": f"D{i}", "content": f"I disagree r{round_num}p{p}i{i}",
+             "timestamp": f"2024-01-0{round_num}T00:0{p}:{i + 10:02d}"}
+            for i in range(2)
+        ]
+        points.append({
+            "id": f"point_{p}", "content": f"point {p}?", "round_num": round_num,
+            "status": "ongoing", "agreements": agreements,
+            "disagreements": disagreements, "participants": ["A0"],
+        })
+    return {"round_num": round_num, "timestamp": f"2024-01-0{round_num}T00:00:00",
+            "points": points, "responses": [], "current_round": round_num, "status": "ongoing"}
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    os.environ.setdefault("OPENROUTER_API_KEY", "sk-or-test")
+    work = tmp_path_factory.mktemp("agora")
+    cwd = os.getcwd()
+    os.chdir(work)
+    os.makedirs("discussions")
+    for round_num in (1, 2, 3):
+        with open(f"discussions/round_{round_num}.json", "wb") as f:
+            f.write(orjson.dumps(_round(round_num, round_num)))
+
+    from religion_one_thinking.api import routes
+    yield TestClient(routes.app)
+    os.chdir(cwd)
+
+
+def test_etag_differs_per_page(client):
+    first = client.get("/agora", params={"page": 1, "page_size": 5})
+    second = client.get("/agora", params={"page": 2, "page_size": 5})
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] != second.headers["etag"]
+
+    # 第 1 页的 ETag 不能让第 2 页返回 304
+    again = client.get("/agora", params={"page": 2, "page_size": 5},
+                       headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 200
+    assert again.json()["messages"] == second.json()["messages"]
+
+    cached = client.get("/agora", params={"page": 2, "page_size": 5},
+                        headers={"If-None-Match": second.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_etag_covers_page_size_and_cursor(client):
+    small = client.get("/agora", params={"page_size": 5})
+    large = client.get("/agora", params={"page_size": 6})
+    assert small.headers["etag"] != large.headers["etag"]
+
+    cursor = small.json()["nextCursor"]
+    after = client.get("/agora", params={"page_size": 5, "cursor": cursor})
+    assert after.headers["etag"] != small.headers["etag"]
+
+
+def test_cursor_walk_has_no_duplicates_or_gaps(client):
+    everything = client.get("/agora", params={"page_size": 100}).json()
+    expected = everything["messages"]
+    assert len(expected) == everything["pagination"]["total"] > 7
+
+    walked = []
+    params = {"page_size": 7}
+    while True:
+        body = client.get("/agora", params=params).json()
+        walked.extend(body["messages"])
+        if not body["nextCursor"]:
+            break
+        params["cursor"] = body["nextCursor"]
+    assert walked == expected
+
+
+def test_bad_cursor_is_rejected(client):
+    response = client.get("/agora", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip():
+    from religion_one_thinking.api.message_index import decode_cursor, encode_cursor
+
+    entry = ("2024-01-02T00:01:00", 2, 1, 3)
+    assert decode_cursor(encode_cursor(entry)) == entry
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
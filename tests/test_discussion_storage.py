@@ -0,0 +1,62 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from religion_one_thinking.discussion.discussion_point import DiscussionPoint
+from religion_one_thinking.utils.discussion_storage import DiscussionStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = DiscussionStorage(save_dir=str(tmp_path))
+    yield storage
+    storage.close()
+
+
+def _save(storage, round_num, points):
+    point_rows, response_rows, progress = storage.collect_changes(points)
+    storage.save_round(round_num, datetime(2024, 1, round_num), "ongoing", point_rows, response_rows)
+    storage.mark_saved(progress)
+    return point_rows, response_rows
+
+
+def _count(storage, table):
+    conn = sqlite3.connect(storage.db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_save_round_writes_only_changes(storage):
+    first = DiscussionPoint("first?", 1)
+    second = DiscussionPoint("second?", 1)
+    first.add_response({"author": "A", "content": "I agree"})
+    second.add_response({"author": "B", "content": "I disagree"})
+
+    point_rows, response_rows = _save(storage, 1, [first, second])
+    assert len(point_rows) == 2 and len(response_rows) == 2
+
+    # 第二轮：只有 first 多了一条回复，second 的状态变化
+    first.add_response({"author": "C", "content": "I disagree with that"})
+    second.status = "concluded"
+    point_rows, response_rows = _save(storage, 2, [first, second])
+    assert [row[0] for row in point_rows] == [second.id]
+    assert [(row[0], row[1]) for row in response_rows] == [(first.id, "C")]
+
+    # 没有变化时不写入任何讨论点或回复
+    assert _save(storage, 3, [first, second]) == ([], [])
+
+    assert _count(storage, "points") == 2
+    assert _count(storage, "responses") == 3
+    assert storage.latest_round() == 3
+
+
+def test_unsaved_changes_are_collected_again(storage):
+    point = DiscussionPoint("point?", 1)
+    point.add_response({"author": "A", "content": "I agree"})
+
+    # save_round 失败时不调用 mark_saved，下一次仍会收集到同样的增量
+    first = storage.collect_changes([point])
+    assert storage.collect_changes([point])[:2] == first[:2]
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+import orjson
+import pytest
+
+from religion_one_thinking.thinkers import gpt_thinker
+from religion_one_thinking.thinkers.base_thinker import BaseThinker
+from religion_one_thinking.utils.memory_agent import MEMORY_FILENAME, MemoryAgent
+
+
+@pytest.fixture
+def thinker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gpt_thinker, "MEMORY_COMPACT_EVERY", 3)
+    replies = ["I agree.\nMEMORIES:\n- a\n- b\n", "I propose.\nMEMORIES:\n- c\n"]
+
+    async def fake_generate(self, messages, max_retries=3):
+        return replies.pop(0)
+
+    monkeypatch.setattr(BaseThinker, "generate_response", fake_generate)
+    t = gpt_thinker.GPTThinker(api_key="sk-or-test")
+    yield t
+    t.close()
+
+
+def test_compaction_keeps_memory_agent_records(thinker):
+    # 大小写不敏感的文件系统上 MemoryAgent 的 memories/GPT 就是 memories/gpt，这里直接用同一目录
+    with MemoryAgent(save_path=os.path.dirname(thinker.memory_log_file)) as agent:
+        agent.add_memory("agent record", author="GPT", round_num=1)
+        asyncio.run(thinker.generate_response([]))
+        asyncio.run(thinker.generate_response([]))
+
+    assert os.path.basename(thinker.memory_log_file) != MEMORY_FILENAME
+    with open(agent.save_path / MEMORY_FILENAME, "rb") as f:
+        assert [orjson.loads(line)["content"] for line in f] == ["agent record"]
+
+
+def test_compaction_snapshots_and_truncates_log(thinker):
+    asyncio.run(thinker.generate_response([]))
+    with open(thinker.memory_log_file, "rb") as f:
+        assert [orjson.loads(line) for line in f] == ["a", "b"]
+
+    asyncio.run(thinker.generate_response([]))
+    assert os.path.getsize(thinker.memory_log_file) == 0
+    with open(thinker.memory_file, "rb") as f:
+        assert orjson.loads(f.read()) == ["a", "b", "c"]
+    assert not os.path.exists(thinker.memory_log_file + ".tmp")
+
+    thinker.close()
+    assert gpt_thinker.GPTThinker(api_key="sk-or-test").memories == ["a", "b", "c"]
@@ -0,0 +1,45 @@
+import logging
+import logging.handlers
+
+import pytest
+
+# 与真实入口一样，先导入会在导入时调用 logging.basicConfig 的模块
+import religion_one_thinking.discussion.orchestrator  # noqa: F401
+from religion_one_thinking.utils import logger as logger_module
+from religion_one_thinking.utils.logger import DiscussionLogger, LOGGER_NAME
+
+
+@pytest.fixture
+def discussion_logger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logger_module._stop_listener()
+    yield DiscussionLogger()
+    logger_module._stop_listener()
+
+
+def test_records_go_through_the_queue_listener(discussion_logger):
+    assert logging.getLogger().handlers, "root logger should already be configured"
+    app_logger = logging.getLogger(LOGGER_NAME)
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in app_logger.handlers)
+    assert logger_module._listener is not None
+
+    discussion_logger.log_response("GPT", "Is AI faith possible?", "I agree.")
+    discussion_logger.log_error("boom")
+    # stop() 会先处理完队列里剩余的记录
+    logger_module._stop_listener()
+
+    content = discussion_logger.log_file.read_text()
+    assert "GPT responding to: Is AI faith possible?" in content
+    assert "ERROR - Error occurred: boom" in content
+
+
+def test_second_instance_reuses_the_listener(discussion_logger):
+    listener = logger_module._listener
+    other = DiscussionLogger()
+    assert logger_module._listener is listener
+    assert other.log_file == discussion_logger.log_file
+    queue_handlers = [
+        h for h in logging.getLogger(LOGGER_NAME).handlers
+        if isinstance(h, logging.handlers.QueueHandler)
+    ]
+    assert len(queue_handlers) == 1
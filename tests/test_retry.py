@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from religion_one_thinking.discussion import orchestrator as orchestrator_module
+from religion_one_thinking.discussion.orchestrator import DiscussionOrchestrator
+from religion_one_thinking.thinkers import GeminiThinker, GPTThinker
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+    }
+
+
+class StubTransport(httpx.MockTransport):
+    """Answers with the given status codes in order, then with a completion."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+        super().__init__(self._handle)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.statuses:
+            status = self.statuses.pop(0)
+            return httpx.Response(status, json={"error": {"message": f"status {status}"}})
+        return httpx.Response(200, json=_completion("I agree, after a retry."))
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(orchestrator_module, "THINK_MAX_BACKOFF", 0)
+    return DiscussionOrchestrator()
+
+
+def _think(orchestrator, thinker_cls, transport):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            thinker = thinker_cls(api_key="sk-or-test", http_client=client)
+            return await orchestrator._think_with_retry(thinker, "Is AI faith possible?", 1)
+
+    return asyncio.run(run())
+
+
+def _status_code(exc: BaseException):
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code
+    return None
+
+
+@pytest.mark.parametrize("thinker_cls", [GeminiThinker, GPTThinker])
+@pytest.mark.parametrize("status", [429, 503])
+def test_transient_status_is_retried(orchestrator, thinker_cls, status):
+    transport = StubTransport([status])
+    response = _think(orchestrator, thinker_cls, transport)
+    assert transport.calls == 2
+    assert response["content"] == "I agree, after a retry."
+
+
+@pytest.mark.parametrize("thinker_cls", [GeminiThinker, GPTThinker])
+def test_client_error_is_not_retried(orchestrator, thinker_cls):
+    transport = StubTransport([400])
+    with pytest.raises(Exception) as excinfo:
+        _think(orchestrator, thinker_cls, transport)
+    assert transport.calls == 1
+    assert _status_code(excinfo.value) == 400
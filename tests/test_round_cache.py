@@ -0,0 +1,58 @@
+import os
+
+import orjson
+import pytest
+
+from religion_one_thinking.api import message_index
+from religion_one_thinking.api.message_index import AgoraIndex
+from religion_one_thinking.utils import file_utils
+
+from test_agora_api import _round
+
+
+@pytest.fixture
+def rounds_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("discussions")
+    file_utils._ROUND_CACHE.clear()
+    yield tmp_path
+    file_utils._ROUND_CACHE.clear()
+
+
+def _write_rounds(count: int) -> None:
+    for round_num in range(1, count + 1):
+        with open(f"discussions/round_{round_num}.json", "wb") as f:
+            f.write(orjson.dumps(_round(round_num, 2)))
+
+
+def test_round_cache_is_bounded(rounds_dir):
+    count = file_utils.ROUND_CACHE_SIZE + 4
+    _write_rounds(count)
+    for round_num in range(1, count + 1):
+        assert file_utils.read_round_data(round_num)["round_num"] == round_num
+    assert len(file_utils._ROUND_CACHE) == file_utils.ROUND_CACHE_SIZE
+    assert set(file_utils._ROUND_CACHE) == set(range(count - file_utils.ROUND_CACHE_SIZE + 1, count + 1))
+
+
+def test_refresh_skips_unchanged_rounds(rounds_dir, monkeypatch):
+    count = file_utils.ROUND_CACHE_SIZE + 4
+    _write_rounds(count)
+    index = AgoraIndex()
+    index.refresh(count + 1)
+    assert index.latest_round == count
+    entries = list(index.entries)
+
+    reads = []
+    def counting_read(round_num):
+        reads.append(round_num)
+        return file_utils.read_round_file(round_num)
+    monkeypatch.setattr(message_index, "read_round_file", counting_read)
+
+    # 缓存已淘汰了早期轮次，但它们的文件没有变化，不应重新解析
+    index.refresh(count + 1)
+    assert reads == []
+    assert list(index.entries) == entries
+    _, round_num, point_idx, response_idx = entries[0]
+    point = _round(round_num, 2)["points"][point_idx]
+    responses = point["agreements"] + point["disagreements"]
+    assert index.response_at(entries[0]) == responses[response_idx]